@@ -0,0 +1,8 @@
+"""
+performance benchmarks for pydlfmt
+
+    python -m benchmarks run --sizes small medium --output new.json
+    python -m benchmarks compare old.json new.json
+
+see benchmarks/README.md
+"""
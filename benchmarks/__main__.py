@@ -0,0 +1,62 @@
+import argparse
+import json
+import sys
+
+from . import compare, run
+from .data import SHAPES
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the benchmarks")
+    run_parser.add_argument("--formats", nargs="+", choices=run.FORMATS)
+    run_parser.add_argument(
+        "--sizes", nargs="+", choices=list(run.SIZES), default=["small", "medium"]
+    )
+    run_parser.add_argument("--shapes", nargs="+", choices=SHAPES)
+    run_parser.add_argument("--variants", nargs="+", choices=run.VARIANTS)
+    run_parser.add_argument("--repeat", type=int, default=1)
+    run_parser.add_argument(
+        "--no-trace", action="store_true", help="skip the tracemalloc build"
+    )
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--output", help="JSON file, default stdout")
+
+    compare_parser = commands.add_parser("compare", help="compare two runs")
+    compare_parser.add_argument("old")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="relative change flagged as a regression, default 0.1",
+    )
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        results = run.run(
+            run.scenarios(args.formats, args.sizes, args.shapes, args.variants),
+            repeat=args.repeat,
+            trace=not args.no_trace,
+            seed=args.seed,
+            log=sys.stderr,
+        )
+        if args.output:
+            run.save(results, args.output)
+        else:
+            json.dump(results, sys.stdout, indent=2)
+        return 0
+
+    changes = compare.compare(
+        compare.load(args.old), compare.load(args.new), args.threshold
+    )
+    compare.report(changes)
+    #  a non-zero exit fails a CI step when anything got worse
+    return 1 if any(x["status"] == "regression" for x in changes) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
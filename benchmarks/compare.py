@@ -0,0 +1,77 @@
+"""
+compare two benchmark runs
+
+each scenario in both runs is compared metric by metric.  a metric that is
+more than `threshold` (a fraction) above the old run is a regression, one
+that's more than `threshold` below it an improvement
+"""
+import json
+
+#  metric: smallest change worth reporting, differences below this are noise
+METRICS = dict(seconds=0.05, peak_rss_mb=1.0, traced_peak_mb=0.5)
+
+
+def load(filename):
+    with open(filename) as f:
+        return json.load(f)
+
+
+def compare(old, new, threshold=0.1):
+    """
+    Args:
+        old (dict): results of the earlier run
+        new (dict): results of the later run
+        threshold (float): relative change that's flagged, 0.1 is 10%
+
+    Returns:
+        list: a dict for each scenario and metric in both runs - name,
+            metric, old, new, ratio and status (regression, improvement or ok)
+    """
+    old_results = {x["name"]: x for x in old["results"] if "error" not in x}
+    changes = []
+    for result in new["results"]:
+        before = old_results.get(result["name"])
+        if before is None or "error" in result:
+            continue
+        for metric, noise in METRICS.items():
+            old_value = before.get(metric)
+            new_value = result.get(metric)
+            if old_value is None or new_value is None:
+                continue
+            ratio = new_value / old_value if old_value else None
+            status = "ok"
+            if abs(new_value - old_value) > noise and ratio is not None:
+                if ratio > 1 + threshold:
+                    status = "regression"
+                elif ratio < 1 - threshold:
+                    status = "improvement"
+            changes.append(
+                dict(
+                    name=result["name"],
+                    metric=metric,
+                    old=old_value,
+                    new=new_value,
+                    ratio=ratio,
+                    status=status,
+                )
+            )
+    return changes
+
+
+def report(changes, file=None):
+    """
+    print the changes as a table
+
+    Args:
+        changes (list): from compare()
+        file: where to print, default sys.stdout
+    """
+    width = max([len(x["name"]) for x in changes] + [8])
+    for change in changes:
+        ratio = "" if change["ratio"] is None else f"{change['ratio']:.2f}x"
+        flag = "" if change["status"] == "ok" else change["status"].upper()
+        print(
+            f"{change['name']:<{width}}  {change['metric']:<14}"
+            f"{change['old']:>10.3f} {change['new']:>10.3f} {ratio:>7}  {flag}",
+            file=file,
+        )
@@ -0,0 +1,159 @@
+"""
+synthetic olympian rows, shaped like examples/input/data.csv
+
+the rows are generated from a seeded random.Random so every run (and every
+machine) benchmarks the same data.  each row can be a dict, a dataclass or a
+class with __slots__.  games_date is a datetime.date and born is a string -
+ISO on even ids and month first on odd ones, with more distinct dates than a
+DateCoercer memoizes, so parsing date strings is benchmarked too
+"""
+import datetime
+import random
+from dataclasses import dataclass
+
+SHAPES = ["dict", "dataclass", "slotted"]
+
+FIELDS = [
+    "id",
+    "name",
+    "sex",
+    "age",
+    "height",
+    "weight",
+    "team",
+    "noc",
+    "games",
+    "year",
+    "season",
+    "city",
+    "sport",
+    "event",
+    "medal",
+    "games_date",
+    "born",
+]
+
+SYLLABLES = [
+    "an", "bel", "cor", "da", "el", "fen", "gar", "hol", "is", "jo", "ka",
+    "lin", "mor", "na", "os", "per", "qui", "ros", "sa", "tor", "ul", "van",
+]
+TEAMS = [
+    ("China", "CHN"),
+    ("Denmark", "DEN"),
+    ("Finland", "FIN"),
+    ("France", "FRA"),
+    ("Germany", "GER"),
+    ("Italy", "ITA"),
+    ("Netherlands", "NED"),
+    ("Norway", "NOR"),
+    ("Spain", "ESP"),
+    ("United States", "USA"),
+]
+SPORTS = [
+    ("Athletics", ["100 metres", "Marathon", "High Jump", "Long Jump"]),
+    ("Basketball", ["Basketball"]),
+    ("Cycling", ["Road Race", "Team Pursuit"]),
+    ("Gymnastics", ["Floor Exercise", "Rings", "Vault"]),
+    ("Judo", ["Lightweight", "Extra-Lightweight", "Heavyweight"]),
+    ("Rowing", ["Single Sculls", "Coxed Eights"]),
+    ("Speed Skating", ["500 metres", "10,000 metres"]),
+    ("Swimming", ["100 metres Freestyle", "200 metres Butterfly"]),
+    ("Tug-Of-War", ["Tug-Of-War"]),
+    ("Wrestling", ["Lightweight, Greco-Roman", "Middleweight, Freestyle"]),
+]
+GAMES = [
+    (1900, "Summer", "Paris"),
+    (1920, "Summer", "Antwerpen"),
+    (1952, "Winter", "Oslo"),
+    (1972, "Summer", "Munich"),
+    (1988, "Winter", "Calgary"),
+    (1992, "Summer", "Barcelona"),
+    (1994, "Winter", "Lillehammer"),
+    (2012, "Summer", "London"),
+    (2014, "Winter", "Sochi"),
+    (2016, "Summer", "Rio de Janeiro"),
+]
+MEDALS = ["NA"] * 17 + ["Gold", "Silver", "Bronze"]
+
+
+@dataclass
+class Olympian:
+    id: int
+    name: str
+    sex: str
+    age: int
+    height: float
+    weight: float
+    team: str
+    noc: str
+    games: str
+    year: int
+    season: str
+    city: str
+    sport: str
+    event: str
+    medal: str
+    games_date: datetime.date
+    born: str
+
+
+class SlottedOlympian:
+    __slots__ = FIELDS
+
+    def __init__(self, **values):
+        for name, value in values.items():
+            setattr(self, name, value)
+
+
+def generate(rows, shape="dict", seed=0):
+    """
+    Args:
+        rows (int): number of rows
+        shape (str): dict, dataclass or slotted
+        seed (int): seed for the random data
+
+    Returns:
+        list: the rows
+    """
+    if shape not in SHAPES:
+        raise ValueError(f"unknown shape {shape}, use {', '.join(SHAPES)}")
+    make = dict(dict=dict, dataclass=Olympian, slotted=SlottedOlympian)[shape]
+
+    rng = random.Random(seed)
+    data = []
+    for i in range(rows):
+        team, noc = rng.choice(TEAMS)
+        sport, events = rng.choice(SPORTS)
+        year, season, city = rng.choice(GAMES)
+        sex = rng.choice("MF")
+        name = " ".join(
+            "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(1, 3))).title()
+            for _ in range(rng.randint(2, 3))
+        )
+        row = dict(
+            id=i + 1,
+            name=name,
+            sex=sex,
+            age=rng.randint(14, 45),
+            height=round(rng.gauss(178 if sex == "M" else 166, 9), 1),
+            weight=round(rng.gauss(76 if sex == "M" else 61, 11), 1),
+            team=team,
+            noc=noc,
+            games=f"{year} {season}",
+            year=year,
+            season=season,
+            city=city,
+            sport=sport,
+            event=f"{sport} {'Men' if sex == 'M' else 'Women'}'s {rng.choice(events)}",
+            medal=rng.choice(MEDALS),
+            games_date=datetime.date(year, 7 if season == "Summer" else 2, 1)
+            + datetime.timedelta(days=rng.randint(0, 16)),
+        )
+        #  worked out from the other fields, so they're the same as before
+        #  born was added
+        born = row["games_date"] - datetime.timedelta(
+            days=row["age"] * 365 + i * 37 % 365
+        )
+        row["born"] = born.strftime("%m/%d/%Y" if i % 2 else "%Y-%m-%d")
+        data.append(make(**row))
+    return data
@@ -0,0 +1,285 @@
+"""
+benchmark scenarios and their measurements
+
+a scenario renders the synthetic olympians to one format, at one size, from
+one row shape, with one variant of report features.  each scenario runs in a
+fresh process so its peak RSS isn't hidden by the scenarios before it: the
+report is built `repeat` times for the wall time, then once more under
+tracemalloc for the peak of python allocations
+"""
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from itertools import product
+
+from pydlfmt import Column, DataFormatter, ReportSection
+
+from .data import SHAPES, generate
+
+try:
+    import resource
+except ImportError:  # windows
+    resource = None
+
+SIZES = dict(small=1_000, medium=100_000, large=1_000_000)
+FORMATS = ["pdf", "xlsx"]
+#  plain has none of the optional features, all has every one of them
+VARIANTS = [
+    "plain",
+    "sections",
+    "tablestyle",
+    "scalars",
+    "dates",
+    "datestrings",
+    "all",
+]
+#  background of the medal winners' rows with a tablestyle
+HIGHLIGHT = "#FFFFE0"
+
+
+@dataclass
+class Scenario:
+    format: str
+    size: str
+    shape: str
+    variant: str
+
+    @property
+    def name(self):
+        return f"{self.format}-{self.size}-{self.shape}-{self.variant}"
+
+    def has(self, feature):
+        return self.variant in [feature, "all"]
+
+
+def scenarios(formats=None, sizes=None, shapes=None, variants=None):
+    """
+    Args:
+        formats, sizes, shapes, variants (list): the values of each
+            dimension to run, all of them when None
+
+    Returns:
+        list: Scenario for every combination
+    """
+    return [
+        Scenario(*x)
+        for x in product(
+            formats or FORMATS,
+            sizes or list(SIZES),
+            shapes or SHAPES,
+            variants or VARIANTS,
+        )
+    ]
+
+
+def build_formatter(scenario, data):
+    """
+    Args:
+        scenario (Scenario): what to render
+        data (list): the rows
+
+    Returns:
+        DataFormatter: set up for the scenario
+    """
+    columns = [
+        Column("id", scalar="COUNT" if scenario.has("scalars") else ""),
+        Column("name"),
+        Column("sex"),
+        Column("age", datatype="int", scalar="AVG" if scenario.has("scalars") else ""),
+        Column(
+            "weight",
+            decimal_positions=1,
+            scalar="TOTAL" if scenario.has("scalars") else "",
+        ),
+        Column("team"),
+        Column("sport"),
+        Column("medal"),
+    ]
+    if scenario.has("dates"):
+        columns.append(Column("games_date", datatype="date"))
+    if scenario.has("datestrings"):
+        #  ISO and month first strings, parsed by the column's DateCoercer
+        columns.append(Column("born", datatype="date"))
+
+    df = DataFormatter()
+    df.title = f"Olympians - {scenario.variant}"
+    if not scenario.has("sections") and not scenario.has("tablestyle"):
+        df.data = data
+        df.columns = columns
+        return df
+
+    #  a tablestyle needs a section, the report level table doesn't take one
+    if scenario.has("sections"):
+        groups = {}
+        for row in data:
+            groups.setdefault(_get(row, "sport"), []).append(row)
+    else:
+        groups = {"": data}
+    for header, rows in sorted(groups.items()):
+        section = ReportSection(header=header, columns=columns, data=rows)
+        if scenario.has("tablestyle"):
+            section.tablestyle = [
+                ("BACKGROUND", (0, i + 1), (-1, i + 1), HIGHLIGHT)
+                for i, row in enumerate(rows)
+                if _get(row, "medal") != "NA"
+            ]
+        df.sections.append(section)
+    return df
+
+
+def _get(row, name):
+    return row[name] if isinstance(row, dict) else getattr(row, name)
+
+
+def peak_rss():
+    """
+    Returns:
+        float: peak resident set size of this process in MB, None when it
+            can't be read
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    #  kilobytes on linux, bytes on macos
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def measure(scenario, repeat=1, trace=True, seed=0):
+    """
+    run a scenario in this process
+
+    Args:
+        scenario (Scenario): what to render
+        repeat (int): number of timed builds, the fastest is reported
+        trace (bool): build once more under tracemalloc
+        seed (int): seed for the data
+
+    Returns:
+        dict: the measurements
+    """
+    data = generate(SIZES[scenario.size], scenario.shape, seed)
+    rss_before = peak_rss()
+    method = dict(pdf="to_pdf", xlsx="to_excel")[scenario.format]
+
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, f"report.{scenario.format}")
+        times = []
+        for _ in range(repeat):
+            df = build_formatter(scenario, data)
+            start = time.perf_counter()
+            getattr(df, method)(filename=filename)
+            times.append(time.perf_counter() - start)
+        output_bytes = os.path.getsize(filename)
+        rss_after = peak_rss()
+
+        traced_peak = None
+        if trace:
+            df = build_formatter(scenario, data)
+            tracemalloc.start()
+            try:
+                getattr(df, method)(filename=filename)
+                traced_peak = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+            finally:
+                tracemalloc.stop()
+
+    return dict(
+        name=scenario.name,
+        **asdict(scenario),
+        rows=SIZES[scenario.size],
+        seconds=min(times),
+        times=times,
+        peak_rss_mb=rss_after,
+        rss_growth_mb=None if rss_before is None else rss_after - rss_before,
+        traced_peak_mb=traced_peak,
+        output_bytes=output_bytes,
+    )
+
+
+def _child(scenario, options, connection):
+    try:
+        connection.send(("ok", measure(scenario, **options)))
+    except BaseException as e:
+        connection.send(("error", f"{type(e).__name__}: {e}"))
+    finally:
+        connection.close()
+
+
+def run(scenario_list, repeat=1, trace=True, seed=0, log=None):
+    """
+    run each scenario in its own process
+
+    Args:
+        scenario_list (list): Scenario objects
+        repeat (int): number of timed builds per scenario
+        trace (bool): measure the peak of python allocations
+        seed (int): seed for the data
+        log: file for progress lines, e.g. sys.stderr
+
+    Returns:
+        dict: metadata about the run and the results of each scenario
+    """
+    context = multiprocessing.get_context("spawn")
+    options = dict(repeat=repeat, trace=trace, seed=seed)
+    results = []
+    for scenario in scenario_list:
+        receiver, sender = context.Pipe(duplex=False)
+        process = context.Process(target=_child, args=(scenario, options, sender))
+        process.start()
+        sender.close()
+        try:
+            status, result = receiver.recv()
+        except EOFError:
+            status, result = "error", f"exited with code {process.exitcode}"
+        process.join()
+        receiver.close()
+        if status != "ok":
+            result = dict(name=scenario.name, **asdict(scenario), error=result)
+        results.append(result)
+        if log is not None:
+            if "error" in result:
+                print(f"{scenario.name}: {result['error']}", file=log)
+            else:
+                print(
+                    f"{scenario.name}: {result['seconds']:.3f}s "
+                    f"rss {result['peak_rss_mb'] or 0:.0f}MB",
+                    file=log,
+                )
+    return dict(metadata=metadata(repeat, trace, seed), results=results)
+
+
+def metadata(repeat, trace, seed):
+    return dict(
+        created=time.strftime("%Y-%m-%dT%H:%M:%S"),
+        python=platform.python_version(),
+        platform=platform.platform(),
+        cpu_count=os.cpu_count(),
+        commit=_git_commit(),
+        repeat=repeat,
+        trace=trace,
+        seed=seed,
+    )
+
+
+def _git_commit():
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+        )
+    except OSError:
+        return None
+    return result.stdout.strip() or None
+
+
+def save(results, filename):
+    with open(filename, "w") as f:
+        json.dump(results, f, indent=2)
@@ -93,6 +93,8 @@ if __name__ == "__main__":
         Column("team"),
         Column("sport"),
     ]
+    #  extract and format the data once for both the pdf and the spreadsheet
+    df.prepare()
     df.to_pdf(filename=os.path.join("../examples", "output", "sample2.pdf"))
     df.to_excel(
         filename=os.path.join("../examples", "output", "sample2.xlsx"),
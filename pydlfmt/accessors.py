@@ -0,0 +1,159 @@
+"""
+compiled row accessors
+
+a section's rows are assumed to share a shape, so the first row is inspected
+once and a getter is built for every column.  the getters are plain callables
+taking a row and returning the cell value (or "" when the row has no such field)
+"""
+from collections.abc import Mapping, Sequence
+from itertools import chain
+from operator import attrgetter, itemgetter, methodcaller
+
+MISSING = ""
+
+
+def peek(data):
+    """
+    get the first row of the data without losing it
+
+    sequences are returned as-is, any other iterable (generators, db cursors,
+    csv readers) is wrapped so the first row is still yielded when iterated.
+    the data is never iterated more than once
+
+    Args:
+        data: list of rows or any iterable of rows
+
+    Returns:
+        tuple: (first row or None when there are no rows, iterable of all rows)
+    """
+    if data is None:
+        return None, ()
+    if isinstance(data, Sequence):
+        return (data[0] if len(data) > 0 else None), data
+
+    rows = iter(data)
+    for first in rows:
+        return first, chain((first,), rows)
+    return None, ()
+
+
+def build_getters(columns, row):
+    """
+    build one getter per column using the shape of the passed row
+
+    Args:
+        columns (list): Column objects for the section
+        row: a representative row, usually the first row of the section
+
+    Returns:
+        list: one callable per column
+    """
+    return [build_getter(column.name, row, position=i) for i, column in enumerate(columns)]
+
+
+def build_getter(name, row, position=None):
+    """
+    build a getter for a single field name
+
+    dotted names ("customer.name") are resolved one segment at a time, each
+    segment compiled against the value found in the representative row
+
+    Args:
+        name (str): field name or dotted path
+        row: a representative row
+        position (int): column position, used for plain tuples/lists
+
+    Returns:
+        callable: row -> value
+    """
+    if "." not in name or _has_field(row, name):
+        return _segment_getter(name, row, position)
+
+    getters = []
+    current = row
+    for segment in name.split("."):
+        getter = _segment_getter(segment, current)
+        getters.append(getter)
+        current = getter(current) if current is not None else None
+
+    def get_path(row):
+        for getter in getters:
+            if row is None or row is MISSING:
+                return MISSING
+            row = getter(row)
+        return row
+
+    return get_path
+
+
+def _has_field(row, name):
+    if isinstance(row, Mapping):
+        return name in row
+    if hasattr(row, "_fields"):
+        return name in row._fields
+    return hasattr(row, name)
+
+
+def _segment_getter(name, row, position=None):
+    if row is None or row is MISSING:
+        #  nothing to inspect, resolve against each row as it comes
+        return _dynamic_getter(name)
+
+    if isinstance(row, Mapping):
+        return methodcaller("get", name, MISSING)
+
+    if hasattr(row, "keys") and hasattr(row, "__getitem__"):
+        #  mapping-like rows without .get, e.g. sqlite3.Row
+        return _mapping_getter(name)
+
+    if isinstance(row, tuple) and hasattr(row, "_fields"):
+        #  namedtuple - index by position, it's cheaper than attribute lookup
+        if name in row._fields:
+            return itemgetter(row._fields.index(name))
+        return _missing
+
+    if isinstance(row, (tuple, list)):
+        if position is not None and position < len(row):
+            return itemgetter(position)
+        return _missing
+
+    #  dataclasses, __slots__ classes and plain objects
+    if hasattr(row, name):
+        return _attribute_getter(name)
+
+    return _missing
+
+
+def _mapping_getter(name):
+    def get_item(row):
+        try:
+            return row[name]
+        except (KeyError, IndexError, TypeError):
+            return MISSING
+
+    return get_item
+
+
+def _attribute_getter(name):
+    getter = attrgetter(name)
+
+    def get_attribute(row):
+        try:
+            return getter(row)
+        except AttributeError:
+            return MISSING
+
+    return get_attribute
+
+
+def _dynamic_getter(name):
+    def get_dynamic(row):
+        if row is None or row is MISSING:
+            return MISSING
+        return _segment_getter(name, row)(row)
+
+    return get_dynamic
+
+
+def _missing(row):
+    return MISSING
@@ -0,0 +1,234 @@
+"""
+column scalars (the totals rows at the end of a section)
+
+an Aggregator is fed each row's raw values as the section is written and keeps
+a running accumulator for every column with a scalar, so the totals are ready
+as soon as the last row has been seen - no second pass over the data and no
+reparsing of formatted values
+"""
+import datetime
+from decimal import Decimal, InvalidOperation
+
+
+def is_blank(value):
+    return value is None or value == ""
+
+
+def to_number(value):
+    """
+    Args:
+        value: int, float, Decimal or numeric string
+
+    Returns:
+        the value as a number, strings are read as Decimal.  None for
+        strings that aren't numbers and for NaN, so they're skipped
+    """
+    if isinstance(value, str):
+        try:
+            value = Decimal(value.replace(",", "").replace("$", "").strip())
+        except InvalidOperation:
+            return None
+    if isinstance(value, Decimal):
+        return None if value.is_nan() else value
+    #  NaN is the only float that isn't equal to itself
+    return None if isinstance(value, float) and value != value else value
+
+
+def rounder(formatter):
+    def convert(value):
+        value = to_number(value)
+        return None if value is None else formatter.round(value)
+
+    return convert
+
+
+def comparable(formatter):
+    """
+    conversion for MIN and MAX on numeric and date columns
+
+    Args:
+        formatter (ColumnFormatter): the column's formatter
+
+    Returns:
+        function: value -> number or date, None for values that aren't one
+            so they're skipped
+    """
+    if formatter.places is not None:
+        return to_number
+
+    coerce = formatter.coerce
+
+    def convert(value):
+        value = coerce(value)
+        return value if isinstance(value, datetime.date) else None
+
+    return convert
+
+
+class Total:
+    def __init__(self):
+        self.total = 0
+
+    def add(self, value):
+        value = to_number(value)
+        if not is_blank(value):
+            try:
+                self.total += value
+            except TypeError:
+                #  float and Decimal values in the same column
+                self.total = Decimal(self.total) + Decimal(value)
+
+    def result(self):
+        return self.total
+
+
+class Average(Total):
+    def __init__(self):
+        super().__init__()
+        self.count = 0
+
+    def add(self, value):
+        value = to_number(value)
+        if not is_blank(value):
+            super().add(value)
+            self.count += 1
+
+    def result(self):
+        if not self.count:
+            return None
+        return Decimal(self.total) / self.count
+
+
+class Count:
+    def __init__(self):
+        self.count = 0
+
+    def add(self, value):
+        if not is_blank(value):
+            self.count += 1
+
+    def result(self):
+        return self.count
+
+
+class Minimum:
+    def __init__(self):
+        self.value = None
+
+    def add(self, value):
+        if is_blank(value):
+            return
+        try:
+            if self.value is None or value < self.value:
+                self.value = value
+        except (TypeError, ArithmeticError):
+            #  can't be compared with the values so far
+            pass
+
+    def result(self):
+        return self.value
+
+
+class Maximum(Minimum):
+    def add(self, value):
+        if is_blank(value):
+            return
+        try:
+            if self.value is None or value > self.value:
+                self.value = value
+        except (TypeError, ArithmeticError):
+            pass
+
+
+class CountDistinct:
+    def __init__(self):
+        self.values = set()
+
+    def add(self, value):
+        if not is_blank(value):
+            self.values.add(value)
+
+    def result(self):
+        return len(self.values)
+
+
+#  Column.scalar values and the accumulator for each
+ACCUMULATORS = dict(
+    TOTAL=Total,
+    AVG=Average,
+    COUNT=Count,
+    MIN=Minimum,
+    MAX=Maximum,
+    COUNT_DISTINCT=CountDistinct,
+)
+#  other names accepted for Column.scalar
+ALIASES = dict(SUM="TOTAL")
+
+
+class Aggregator:
+    def __init__(self, columns, formatters):
+        """
+        Args:
+            columns (list): Column objects for the section
+            formatters (list): ColumnFormatter for each column, date columns
+                are compared as dates rather than strings
+        """
+        self.rows = 0
+        #  (column index, scalar, accumulator, conversion) for each scalar
+        self.accumulators = []
+        for j, column in enumerate(columns):
+            scalar = column.scalar.upper() if column.scalar else None
+            scalar = ALIASES.get(scalar, scalar)
+            if scalar in ACCUMULATORS:
+                formatter = formatters[j]
+                convert = formatter.coerce
+                if scalar in ["TOTAL", "AVG"] and formatter.places is not None:
+                    #  totals add up the values as they are displayed
+                    convert = rounder(formatter)
+                elif scalar in ["MIN", "MAX"] and (
+                    formatter.places is not None or formatter.coerce is not None
+                ):
+                    #  text in a numeric or date column is skipped
+                    convert = comparable(formatter)
+                self.accumulators.append(
+                    (j, scalar, ACCUMULATORS[scalar](), convert)
+                )
+
+    def __bool__(self):
+        return bool(self.accumulators)
+
+    def add(self, values):
+        """
+        add a row to the running scalars
+
+        Args:
+            values (list): the row's raw value for each column
+        """
+        self.rows += 1
+        for j, _, accumulator, convert in self.accumulators:
+            value = values[j]
+            if convert is not None and not is_blank(value):
+                value = convert(value)
+            accumulator.add(value)
+
+    @property
+    def scalars(self):
+        """
+        Returns:
+            list: the scalars in use, in the order their rows are written
+        """
+        return sorted(set(x[1] for x in self.accumulators))
+
+    def results(self, scalar):
+        """
+        Args:
+            scalar (str): one of ACCUMULATORS
+
+        Returns:
+            dict: column index to result for the columns using the scalar
+        """
+        return {
+            j: accumulator.result()
+            for j, name, accumulator, _ in self.accumulators
+            if name == scalar
+        }
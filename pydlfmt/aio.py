@@ -0,0 +1,138 @@
+"""
+asyncio rendering
+
+the to_*_async methods of DataFormatter run the build on an executor so the
+event loop isn't blocked while the report is built.  an AsyncRenderer holds
+the executor and limits how many builds run at once, the rest wait for a
+slot without holding a worker.  a build that's cancelled before it starts is
+never run.  one that has started on a thread is stopped through a cancel
+token of its own, linked to the formatter's cancel_token, so the formatter's
+other builds carry on.  one that has started in another process runs to the
+end and its result is dropped
+"""
+import asyncio
+import os
+import weakref
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from .progress import CancelToken
+
+_default_renderer = None
+
+
+class AsyncRenderer:
+    def __init__(self, executor=None, limit=None, processes=False):
+        """
+        Args:
+            executor: concurrent.futures executor the builds run on.  one is
+                created when not passed, and shut down by shutdown()
+            limit (int): most builds running at once, default os.cpu_count()
+            processes (bool): create a process pool instead of a thread pool.
+                the formatter is pickled to the worker, so the output has to
+                be a file name or returned as bytes
+        """
+        self.limit = limit or os.cpu_count() or 1
+        self.owns_executor = executor is None
+        if executor is None:
+            pool = ProcessPoolExecutor if processes else ThreadPoolExecutor
+            executor = pool(max_workers=self.limit)
+        self.executor = executor
+        #  an asyncio.Semaphore for each event loop the renderer is used from
+        self._slots = weakref.WeakKeyDictionary()
+
+    async def run(self, formatter, method, *args, **kwargs):
+        """
+        run one of the formatter's to_ methods on the executor
+
+        Args:
+            formatter (DataFormatter): the data and columns to render
+            method (str): to_pdf, to_excel, to_csv or to_jsonl
+            args, kwargs: arguments for the method
+
+        Returns:
+            whatever the method returns - the output as bytes when there's
+            no filename
+        """
+        loop = asyncio.get_running_loop()
+        slots = self._slots.get(loop)
+        if slots is None:
+            slots = self._slots[loop] = asyncio.Semaphore(self.limit)
+
+        #  a token for this call only, still cancelled with the formatter's.
+        #  a process pool would have to pickle it
+        token = None
+        if not isinstance(self.executor, ProcessPoolExecutor):
+            token = CancelToken(
+                parent=kwargs.get("cancel_token")
+                or getattr(formatter, "cancel_token", None)
+            )
+            kwargs = dict(kwargs, cancel_token=token)
+
+        #  cancelled while waiting here, the build is never submitted
+        await slots.acquire()
+        try:
+            future = self.executor.submit(_call, formatter, method, args, kwargs)
+        except BaseException:
+            slots.release()
+            raise
+
+        #  the slot is held until the build is finished, even when the
+        #  caller stops waiting for it
+        def release(_):
+            try:
+                loop.call_soon_threadsafe(slots.release)
+            except RuntimeError:
+                #  the loop has been closed
+                pass
+
+        future.add_done_callback(release)
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            #  the worker stops at the next progress check and removes the
+            #  partial output
+            if token is not None:
+                token.cancel()
+            raise
+
+    def shutdown(self, wait=True):
+        """
+        shut down the executor, if the renderer created it
+
+        Args:
+            wait (bool): wait for the running builds to finish
+        """
+        if self.owns_executor:
+            self.executor.shutdown(wait=wait)
+
+
+def _call(formatter, method, args, kwargs):
+    return getattr(formatter, method)(*args, **kwargs)
+
+
+def get_renderer():
+    """
+    Returns:
+        AsyncRenderer: the renderer used when none is passed, a thread pool
+            of os.cpu_count() workers
+    """
+    global _default_renderer
+    if _default_renderer is None:
+        _default_renderer = AsyncRenderer()
+    return _default_renderer
+
+
+def set_renderer(renderer):
+    """
+    replace the renderer used when none is passed
+
+    Args:
+        renderer (AsyncRenderer): the new default
+    """
+    global _default_renderer
+    _default_renderer = renderer
+
+
+async def render_async(formatter, method, args, kwargs, renderer=None):
+    renderer = renderer or get_renderer()
+    return await renderer.run(formatter, method, *args, **kwargs)
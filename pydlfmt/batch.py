@@ -0,0 +1,163 @@
+"""
+batch rendering on a pool of worker processes
+
+render_batch() renders many independent reports - one per customer, say - on
+a process pool.  each worker registers the fonts and builds the stylesheet
+once when it starts, so the reports it renders after that don't pay for it
+"""
+import os
+import pickle
+import traceback
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from itertools import islice
+
+from . import DataFormatter
+from .parallel import RENDERERS, get_context
+
+
+@dataclass
+class BatchJob:
+    data: list
+    columns: list
+    filename: str
+    format: str = "pdf"
+    #  keyword arguments for the format's to_ method
+    options: dict = field(default_factory=dict)
+
+
+@dataclass
+class BatchResult:
+    index: int
+    filename: str
+    error: Exception = None
+    traceback: str = None
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+def _warm_up():
+    #  runs once in each worker as it starts
+    from . import pdf, xlsx  # noqa: F401
+    from .resources import get_stylesheet, register_fonts
+
+    register_fonts()
+    get_stylesheet()
+
+
+def _run_job(formatter_class, index, job):
+    try:
+        if job.format not in RENDERERS:
+            raise ValueError(
+                f"unknown format {job.format}, use {', '.join(RENDERERS)}"
+            )
+        formatter = formatter_class(data=job.data)
+        formatter.columns = job.columns
+        getattr(formatter, RENDERERS[job.format])(filename=job.filename, **job.options)
+    except Exception as e:
+        try:
+            pickle.dumps(e)
+        except Exception:
+            #  the exception has to travel back to the parent
+            e = RuntimeError(repr(e))
+        return BatchResult(index, job.filename, e, traceback.format_exc())
+    return BatchResult(index, job.filename)
+
+
+def _run_chunk(formatter_class, chunk):
+    return [_run_job(formatter_class, index, job) for index, job in chunk]
+
+
+def render_batch(jobs, workers=None, chunksize=1, formatter_class=DataFormatter):
+    """
+    render jobs on a pool of worker processes
+
+    jobs are read from the iterable as workers become free, so a generator of
+    jobs is never held in memory all at once
+
+    Args:
+        jobs: iterable of BatchJob
+        workers (int): number of worker processes, defaults to the CPU count
+        chunksize (int): jobs sent to a worker at a time, larger chunks cut the
+            overhead of many small reports
+        formatter_class (type): DataFormatter or a subclass, constructed with
+            data= for each job
+
+    Returns:
+        generator: a BatchResult for each job, in the order of the jobs.  a
+            job that fails doesn't stop the others, its result has the error -
+            a BrokenProcessPool when it killed its worker process
+    """
+    workers = workers or os.cpu_count() or 1
+    numbered = enumerate(jobs)
+    chunks = iter(lambda: list(islice(numbered, chunksize)), [])
+
+    executor = _executor(workers)
+    #  (future, chunk, the executor running it)
+    pending = deque()
+
+    def results(keep):
+        #  results of the pending chunks, in order, until only keep are left
+        nonlocal executor
+        while len(pending) > keep:
+            future, chunk, pool = pending.popleft()
+            try:
+                chunk_results = future.result()
+            except BrokenProcessPool:
+                #  a worker died (killed for its memory, or crashed) and took
+                #  the pool with it, along with every chunk that wasn't done.
+                #  those jobs are run again one at a time on a new pool, so
+                #  only the job that kills its worker fails
+                if pool is executor:
+                    executor.shutdown(wait=False)
+                    executor = _executor(workers)
+                chunk_results = []
+                for index, job in chunk:
+                    result, executor = _run_alone(
+                        executor, workers, formatter_class, index, job
+                    )
+                    chunk_results.append(result)
+            yield from chunk_results
+
+    try:
+        for chunk in chunks:
+            try:
+                future = executor.submit(_run_chunk, formatter_class, chunk)
+            except BrokenProcessPool:
+                #  a worker died since the last chunk was submitted, the
+                #  chunks it took down are run again by results()
+                executor.shutdown(wait=False)
+                executor = _executor(workers)
+                future = executor.submit(_run_chunk, formatter_class, chunk)
+            pending.append((future, chunk, executor))
+            #  keep every worker busy without submitting everything up front
+            yield from results(workers * 2)
+        yield from results(0)
+    finally:
+        executor.shutdown()
+
+
+def _executor(workers):
+    return ProcessPoolExecutor(
+        max_workers=workers, mp_context=get_context(), initializer=_warm_up
+    )
+
+
+def _run_alone(executor, workers, formatter_class, index, job):
+    """
+    run a job on its own, after a worker died
+
+    Returns:
+        tuple: (BatchResult, executor) - a new executor when the job killed
+            its worker too
+    """
+    try:
+        return executor.submit(_run_job, formatter_class, index, job).result(), executor
+    except BrokenProcessPool as e:
+        executor.shutdown(wait=False)
+        result = BatchResult(index, job.filename, e, traceback.format_exc())
+        return result, _executor(workers)
@@ -0,0 +1,140 @@
+"""
+columnar intermediate shared by the renderers
+
+ColumnarData pulls a section's values out of its rows and formats them once.
+the PDF and XLSX renderers read the prepared values and display strings
+instead of extracting and formatting the rows again, so rendering the same
+data to several formats only pays for that once.  see DataFormatter.prepare()
+"""
+from collections.abc import Sequence
+
+from . import ExcelFormula
+from .accessors import build_getters, peek
+from .formatters import compile_columns
+from .sources import is_columnar, read_columns
+from .widths import LINE_BREAK, WidthEstimator
+
+
+class ColumnarData(Sequence):
+    """
+    a section's data held by column - the typed value and display string of
+    every cell plus the width of the widest line in each column
+
+    as a Sequence each row is a tuple of values in column order, so it can
+    still be passed anywhere a list of rows is expected
+    """
+
+    def __init__(self, columns, data):
+        """
+        Args:
+            columns (list): Column objects for the section
+            data: list of rows or any iterable of rows, iterated once.  or a
+                numpy structured array, pandas DataFrame or arrow table
+        """
+        self.columns = list(columns)
+        #  typed value of each cell, dates are coerced to date/datetime
+        self.values = [[] for _ in self.columns]
+        #  display string of each cell, "" for empty cells
+        self.texts = [[] for _ in self.columns]
+        #  widest line in each column, in characters
+        self.widths = [0 for _ in self.columns]
+
+        formatters = compile_columns(self.columns)
+        if is_columnar(data):
+            #  numpy/pandas/arrow data is read a column at a time
+            self.values, self.texts = read_columns(self.columns, data, formatters)
+        else:
+            self._read_rows(data, formatters)
+        self.widths = [widest_line(x) for x in self.texts]
+
+    def _read_rows(self, data, formatters):
+        first, rows = peek(data)
+        if first is None:
+            return
+
+        getters = build_getters(self.columns, first)
+        #  formulas are written as they are, they have no display string
+        formulas = [bool(x.excel_formula) for x in self.columns]
+        cells = list(zip(getters, formatters, formulas, self.values, self.texts))
+        for row in rows:
+            for getter, formatter, formula, values, texts in cells:
+                value = getter(row)
+                if not value or formula or isinstance(value, ExcelFormula):
+                    texts.append("")
+                else:
+                    if formatter.coerce is not None:
+                        value = formatter.coerce(value)
+                    texts.append(formatter.prefix + formatter.format(value))
+                values.append(value)
+
+    def __len__(self):
+        return len(self.values[0]) if self.values else 0
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return tuple(values[index] for values in self.values)
+
+    def indexes(self, columns):
+        """
+        Args:
+            columns (list): Column objects, all of them prepared
+
+        Returns:
+            list: position of each column in the prepared columns
+        """
+        indexes = []
+        for column in columns:
+            for i, prepared in enumerate(self.columns):
+                if prepared is column:
+                    indexes.append(i)
+                    break
+            else:
+                raise ValueError(
+                    f"column {column.name!r} wasn't prepared, call prepare() "
+                    "again after changing the columns"
+                )
+        return indexes
+
+    def records(self, columns):
+        """
+        the prepared rows for some of the columns
+
+        Args:
+            columns (list): Column objects, all of them prepared
+
+        Returns:
+            iterable: (values, texts) tuples for each row
+        """
+        indexes = self.indexes(columns)
+        return zip(
+            zip(*[self.values[i] for i in indexes]),
+            zip(*[self.texts[i] for i in indexes]),
+        )
+
+
+def widest_line(texts):
+    """
+    Args:
+        texts (list): display strings of a column
+
+    Returns:
+        int: length of the longest line, lines are split on <br />
+    """
+    if any(LINE_BREAK in x for x in texts if "<" in x):
+        return max((WidthEstimator.line_width(len, x) for x in texts), default=0)
+    return max(map(len, texts), default=0)
+
+
+def read_source(columns, data):
+    """
+    Args:
+        columns (list): Column objects
+        data: the section's data
+
+    Returns:
+        ColumnarData for a numpy, pandas or arrow source, otherwise the data
+    """
+    if is_columnar(data):
+        return ColumnarData(columns, data)
+    return data
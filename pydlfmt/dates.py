@@ -0,0 +1,122 @@
+"""
+date/datetime coercion for date and datetime columns
+
+each column gets its own DateCoercer.  strings are tried with fromisoformat
+first, then with the strptime format that worked for earlier values in the
+column, then with the other DATE_FORMATS.  dateutil only sees the values none
+of those can read.  results are memoized, date columns tend to repeat values.
+"""
+import datetime
+
+#  strptime formats tried, in order, for strings fromisoformat can't read.
+#  month first, the same as dateutil's default
+DATE_FORMATS = [
+    "%m/%d/%Y",
+    "%m/%d/%Y %I:%M%p",
+    "%m/%d/%Y %I:%M %p",
+    "%m/%d/%Y %H:%M",
+    "%m/%d/%Y %H:%M:%S",
+    "%m/%d/%y",
+    "%m-%d-%Y",
+    "%Y/%m/%d",
+    "%Y%m%d",
+    "%d-%b-%Y",
+    "%b %d, %Y",
+    "%B %d, %Y",
+]
+
+ISO = "iso"
+
+
+class DateCoercer:
+    def __init__(self, datatype="date", cache_size=10000):
+        """
+        Args:
+            datatype (str): date or datetime - the type values are coerced to
+            cache_size (int): maximum number of memoized strings
+        """
+        self.to_datetime = datatype.lower() == "datetime"
+        self.cache_size = cache_size
+        self.cache = {}
+        #  the format that read the last value, ISO or a strptime format
+        self.format = None
+
+    def __call__(self, value):
+        """
+        coerce a value to a date (or datetime)
+
+        Args:
+            value: date, datetime or string
+
+        Returns:
+            the date/datetime, or the value unchanged if it can't be read as one
+        """
+        if isinstance(value, datetime.datetime):
+            return value if self.to_datetime else value.date()
+        if isinstance(value, datetime.date):
+            if self.to_datetime:
+                return datetime.datetime.combine(value, datetime.time())
+            return value
+        if not isinstance(value, str):
+            return value
+
+        try:
+            return self.cache[value]
+        except KeyError:
+            pass
+
+        parsed = self.parse(value.strip())
+        if parsed is None:
+            result = value
+        elif self.to_datetime:
+            result = parsed
+        else:
+            result = parsed.date()
+
+        if len(self.cache) >= self.cache_size:
+            self.cache.clear()
+        self.cache[value] = result
+        return result
+
+    def parse(self, text):
+        """
+        parse a string to a datetime
+
+        Args:
+            text (str): the string to parse
+
+        Returns:
+            datetime: the parsed value or None if it can't be parsed
+        """
+        if not text:
+            return None
+
+        if self.format is not None:
+            parsed = self._parse_with(text, self.format)
+            if parsed is not None:
+                return parsed
+
+        for fmt in [ISO] + DATE_FORMATS:
+            if fmt == self.format:
+                continue
+            parsed = self._parse_with(text, fmt)
+            if parsed is not None:
+                self.format = fmt
+                return parsed
+
+        from dateutil.parser import parse
+
+        try:
+            return parse(text)
+        except (ValueError, OverflowError):
+            return None
+
+    @staticmethod
+    def _parse_with(text, fmt):
+        try:
+            if fmt == ISO:
+                return datetime.datetime.fromisoformat(text)
+            return datetime.datetime.strptime(text, fmt)
+        except ValueError:
+            return None
+
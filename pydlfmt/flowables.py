@@ -0,0 +1,197 @@
+"""
+reportlab flowables used by PDFReport
+"""
+from bisect import bisect_left, bisect_right
+
+from reportlab.platypus import Table, TableStyle
+from reportlab.platypus.flowables import Flowable
+
+
+class LazyTable(Flowable):
+    """
+    a table whose rows are pulled from an iterator while the document is built
+
+    only the rows for the page being laid out are held in memory.  each page
+    gets a regular reportlab Table made of the heading rows plus as many
+    detail rows as fit, so the heading is repeated on every page.  once the
+    detail rows run out, the rows returned by tail() (the scalar rows) are
+    added to the end of the table.
+
+    style commands use the coordinates of the whole table - they are
+    translated to each page's chunk as it is built.
+    """
+
+    def __init__(
+        self,
+        header_rows,
+        rows,
+        col_widths,
+        style,
+        tail=None,
+        row_heights=None,
+        chunk_rows=100,
+    ):
+        super().__init__()
+        self.header_rows = list(header_rows)
+        self.rows = iter(rows)
+        self.col_widths = col_widths
+        self.style = list(style or [])
+        self.tail = tail
+        self.row_heights = row_heights
+        self.chunk_rows = chunk_rows
+        self._index_style()
+
+        self.pending = []
+        #  number of detail rows already drawn on previous pages
+        self.offset = 0
+        self.exhausted = False
+        self._table = None
+
+    def _fill(self, count):
+        while not self.exhausted and len(self.pending) < count:
+            try:
+                self.pending.append(next(self.rows))
+            except StopIteration:
+                self.exhausted = True
+                if self.tail:
+                    self.pending.extend(self.tail())
+
+    def _chunk(self):
+        header_count = len(self.header_rows)
+        row_heights = None
+        if self.row_heights:
+            start = header_count + self.offset
+            row_heights = list(self.row_heights[:header_count]) + list(
+                self.row_heights[start : start + len(self.pending)]
+            )
+
+        table = Table(
+            self.header_rows + self.pending,
+            colWidths=self.col_widths,
+            repeatRows=header_count,
+            rowHeights=row_heights,
+        )
+        table.setStyle(TableStyle(self._chunk_style()))
+        return table
+
+    def _index_style(self):
+        #  commands on a few detail rows each (a highlighted row, say) are
+        #  looked up by their start row, so a chunk only goes through the ones
+        #  on its own rows instead of the whole list.  the rest - headings,
+        #  negative rows, long ranges - are checked for every chunk
+        header_count = len(self.header_rows)
+        self.general = []
+        ranged = []
+        for index, command in enumerate(self.style):
+            r0, r1 = command[1][1], command[2][1]
+            if (
+                isinstance(r0, int)
+                and isinstance(r1, int)
+                and header_count <= r0 <= r1 < r0 + self.chunk_rows
+            ):
+                ranged.append((r0, index, command))
+            else:
+                self.general.append((index, command))
+        ranged.sort(key=lambda x: x[:2])
+        self.ranged = [x[1:] for x in ranged]
+        self.range_starts = [x[0] for x in ranged]
+        #  longest range, so ranges starting before the chunk are found too
+        self.range_span = max((x[2][2][1] - x[0] for x in ranged), default=0)
+
+    def _chunk_commands(self):
+        """
+        Returns:
+            list: the style commands that can touch the chunk, in their order
+        """
+        first = len(self.header_rows) + self.offset
+        last = first + len(self.pending) - 1
+        i = bisect_left(self.range_starts, first - self.range_span)
+        j = bisect_right(self.range_starts, last)
+        commands = self.ranged[i:j]
+        if not commands:
+            return [x[1] for x in self.general]
+        return [x[1] for x in sorted(commands + self.general, key=lambda x: x[0])]
+
+    def _chunk_style(self):
+        header_count = len(self.header_rows)
+        chunk_rows = header_count + len(self.pending)
+        total_rows = header_count + self.offset + len(self.pending)
+
+        style = []
+        for command in self._chunk_commands():
+            (c0, r0), (c1, r1) = command[1], command[2]
+            if not isinstance(r0, int) or not isinstance(r1, int):
+                #  splitfirst/splitlast etc. - already relative to the chunk
+                style.append(command)
+                continue
+
+            if self.exhausted:
+                r0 = r0 + total_rows if r0 < 0 else r0
+                r1 = r1 + total_rows if r1 < 0 else r1
+            elif r0 < 0:
+                #  refers to the last rows of the table, not on this page
+                continue
+            elif r1 < 0:
+                #  runs to the end of the table, so through the end of this chunk
+                r1 = self.offset + chunk_rows
+
+            if r1 < header_count:
+                #  heading rows are the same on every page
+                style.append(command)
+                continue
+
+            #  heading rows keep their place at the top of every chunk.  like
+            #  reportlab's own split, ROWBACKGROUNDS restart on each page
+            stop = min(r1 - self.offset, chunk_rows - 1)
+            if r0 < header_count:
+                start = r0
+                stop = max(stop, header_count - 1)
+            else:
+                start = max(r0 - self.offset, header_count)
+            if stop >= start:
+                style.append((command[0], (c0, start), (c1, stop)) + tuple(command[3:]))
+        return style
+
+    def wrap(self, availWidth, availHeight):
+        self._fill(self.chunk_rows)
+        if not self.exhausted:
+            #  there's more to come, make the frame split us
+            return sum(self.col_widths), availHeight + 1
+        self._table = self._chunk()
+        return self._table.wrap(availWidth, availHeight)
+
+    def split(self, availWidth, availHeight):
+        count = self.chunk_rows
+        while True:
+            self._fill(count)
+            table = self._chunk()
+            parts = table.split(availWidth, availHeight)
+            if len(parts) == 1 and parts[0] is table and not self.exhausted:
+                #  the whole chunk fits, pull more rows to fill the page
+                count += self.chunk_rows
+                continue
+            break
+
+        if not parts:
+            return []
+        if len(parts) == 1 and self.exhausted:
+            self.pending = []
+            return parts
+
+        used = len(parts[0]._cellvalues) - len(self.header_rows)
+        self.pending = self.pending[used:]
+        self.offset += used
+        #  we are our own continuation - a postponement from an earlier frame
+        #  doesn't apply to the rows that are left
+        self.__dict__.pop("_postponed", None)
+        return [parts[0], self]
+
+    def drawOn(self, canvas, x, y, _sW=0):
+        self._table.drawOn(canvas, x, y, _sW)
+
+    def identity(self, maxLen=None):
+        return "<%s at %s> rows drawn=%s" % (
+            self.__class__.__name__,
+            hex(id(self)),
+            self.offset,
+        )
@@ -0,0 +1,155 @@
+"""
+per-column value formatting shared by the renderers
+
+each Column is compiled once per section into a ColumnFormatter that holds
+everything its cells need - the quantizer and format string for numbers, the
+date coercer and strftime format for dates and the excel num_format - so the
+cell loops don't work them out again for every value
+"""
+import datetime
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+
+from .dates import DateCoercer
+
+DATE_FORMAT = "%m/%d/%Y"
+DATETIME_FORMAT = "%m/%d/%Y %I:%M%p"
+
+#  largest magnitude where float * 10 ** (places + 1) is still exact
+FLOAT_DIGITS = 2**53
+
+
+class ColumnFormatter:
+    def __init__(self, column):
+        """
+        Args:
+            column (Column): the column to compile
+        """
+        datatype = column.datatype.lower()
+        self.column = column
+        self.prefix = "$" if column.currency else ""
+
+        #  decimal places numbers are rounded to, None for columns that aren't
+        #  rounded.  date/datetime columns get a coercer instead
+        self.places = None
+        self.coerce = None
+        self.date_format = None
+        if datatype in ["int", "integer"]:
+            self.places = 0
+        elif datatype in ["date", "datetime"]:
+            self.coerce = DateCoercer(datatype)
+            self.date_format = DATE_FORMAT if datatype == "date" else DATETIME_FORMAT
+        elif column.decimal_positions:
+            self.places = column.decimal_positions
+
+        if self.places is not None:
+            self.quantizer = Decimal(1).scaleb(-self.places)
+            self.pattern = "{0:%s.%sf}" % (
+                "," if column.include_commas else "",
+                self.places,
+            )
+            #  no thousands separators, for machine readable output
+            self.plain_pattern = "{0:.%sf}" % self.places
+            #  a float is only a rounding tie if it has exactly places + 1
+            #  decimals ending in 5, those go through Decimal to round half up
+            self.tie_scale = 10 ** (self.places + 1)
+            self.float_limit = FLOAT_DIGITS / self.tie_scale
+
+        self.num_format = self._num_format(column, datatype)
+
+    def round(self, value):
+        """
+        round a number to the column's decimal places, half up
+
+        Args:
+            value: int, float, Decimal or numeric string
+
+        Returns:
+            Decimal: the rounded value
+        """
+        return Decimal(value).quantize(self.quantizer, rounding=ROUND_HALF_UP)
+
+    def format(self, value):
+        """
+        format a cell value for display, without the currency sign
+
+        Args:
+            value: the cell value
+
+        Returns:
+            str: the formatted value
+        """
+        if self.places is not None:
+            #  ints go through float too, so only those small enough to
+            #  convert exactly.  ints never end in a 5 at places + 1
+            kind = type(value)
+            if (
+                (kind is float or kind is int)
+                and -self.float_limit < value < self.float_limit
+                and value * self.tie_scale % 10 != 5
+            ):
+                return self.pattern.format(value)
+            try:
+                return self.pattern.format(self.round(value))
+            except (InvalidOperation, TypeError, ValueError):
+                #  not a number, shown as it is
+                return str(value)
+
+        if self.coerce is not None:
+            value = self.coerce(value)
+            if isinstance(value, datetime.date):
+                return value.strftime(self.date_format)
+
+        return str(value)
+
+    def number(self, value):
+        """
+        the rounded number as plain text - no currency sign or commas
+
+        Args:
+            value: int, float, Decimal or numeric string
+
+        Returns:
+            str: the number, None if the value isn't a finite number
+        """
+        kind = type(value)
+        if (
+            (kind is float or kind is int)
+            and -self.float_limit < value < self.float_limit
+            and value * self.tie_scale % 10 != 5
+        ):
+            return self.plain_pattern.format(value)
+        try:
+            rounded = self.round(value)
+        except (InvalidOperation, TypeError, ValueError):
+            return None
+        return self.plain_pattern.format(rounded) if rounded.is_finite() else None
+
+    @staticmethod
+    def _num_format(column, datatype):
+        num_format = None
+        if datatype in ["int", "integer"]:
+            num_format = "#,##0"
+        elif column.decimal_positions and column.decimal_positions > 0:
+            num_format = "#,##0.000000000000"[: column.decimal_positions + 6]
+
+        if datatype == "date":
+            num_format = "mm/dd/yyyy"
+        if datatype == "datetime":
+            num_format = "mm/dd/yyyy HH:MM AM/PM"
+
+        if column.currency:
+            num_format = "$ #,##0.000000000000"[: (column.decimal_positions or 2) + 8]
+        return num_format
+
+
+def compile_columns(columns):
+    """
+    compile a ColumnFormatter for each column
+
+    Args:
+        columns (list): Column objects for the section
+
+    Returns:
+        list: a ColumnFormatter for each column
+    """
+    return [ColumnFormatter(column) for column in columns]
@@ -0,0 +1,157 @@
+"""
+rendering in worker processes
+
+DataFormatter.render() runs each output format in its own process.  where the
+platform can fork, the workers inherit the formatter and its data instead of
+having them pickled over to them.  when other threads are running it isn't
+safe to fork, and the formatter is pickled to the workers instead
+"""
+import multiprocessing
+import os
+import threading
+import traceback
+from collections.abc import Sequence
+
+#  DataFormatter method for each output format
+RENDERERS = dict(pdf="to_pdf", xlsx="to_excel", csv="to_csv", jsonl="to_jsonl")
+
+
+class WorkerTraceback(Exception):
+    """
+    the traceback of an exception raised in a worker process, set as the
+    __cause__ of the exception when it's raised again in the parent
+    """
+
+    def __init__(self, text):
+        super().__init__(text)
+        self.text = text
+
+    def __str__(self):
+        return f'\n"""\n{self.text}"""'
+
+
+def render(formatter, fmt, options):
+    """
+    render a formatter's data to one format in this process
+
+    Args:
+        formatter (DataFormatter): the data and columns to render
+        fmt (str): one of RENDERERS
+        options (dict): keyword arguments for the format's method
+
+    Returns:
+        str: the file written
+    """
+    getattr(formatter, RENDERERS[fmt])(**options)
+    return options.get("filename")
+
+
+def _worker(formatter, fmt, options, connection):
+    try:
+        result = ("ok", render(formatter, fmt, options))
+    except BaseException as e:
+        result = ("error", e, traceback.format_exc())
+    try:
+        connection.send(result)
+    except Exception:
+        #  the exception can't be pickled, send what it said instead
+        connection.send(("error", RuntimeError(repr(result[1])), result[2]))
+    finally:
+        connection.close()
+
+
+def get_context():
+    """
+    Returns:
+        multiprocessing context used for the workers - fork where it's
+        available, so the data doesn't have to be pickled.  while other
+        threads are running, forkserver or spawn: a forked child only gets
+        the thread that forked, and a lock another thread was holding at that
+        moment (the stylesheet's, the logging module's) stays locked in the
+        child forever
+    """
+    methods = multiprocessing.get_all_start_methods()
+    if threading.active_count() > 1:
+        for method in ["forkserver", "spawn"]:
+            if method in methods:
+                return multiprocessing.get_context(method)
+    if "fork" in methods:
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context()
+
+
+def render_formats(formatter, formats, filename=None, parallel=True, options=None):
+    """
+    render a formatter's data to several formats, each in its own process
+
+    Args:
+        formatter (DataFormatter): the data and columns to render
+        formats (list): output formats, see RENDERERS
+        filename (str): output file, its extension is replaced for each
+            format.  defaults to the formatter's filename
+        parallel (bool): False renders the formats one after the other in
+            this process
+        options (dict): keyword arguments for each format's method, by format
+
+    Returns:
+        dict: the file written for each format
+    """
+    unknown = [x for x in formats if x not in RENDERERS]
+    if unknown:
+        raise ValueError(
+            f"unknown format {', '.join(unknown)}, use {', '.join(RENDERERS)}"
+        )
+    options = options or {}
+    base = os.path.splitext(filename or formatter.filename or "report")[0]
+    jobs = {}
+    for fmt in formats:
+        jobs[fmt] = dict(options.get(fmt) or {})
+        jobs[fmt].setdefault("filename", f"{base}.{fmt}")
+
+    #  an iterator can only be read once, so it's read here for every format
+    if not isinstance(formatter.data, Sequence) or any(
+        not isinstance(x.data, Sequence) for x in formatter.sections
+    ):
+        formatter.prepare()
+
+    if not parallel or len(jobs) < 2:
+        return {fmt: render(formatter, fmt, kwargs) for fmt, kwargs in jobs.items()}
+
+    context = get_context()
+    workers = {}
+    for fmt, kwargs in jobs.items():
+        receiver, sender = context.Pipe(duplex=False)
+        process = context.Process(
+            target=_worker,
+            args=(formatter, fmt, kwargs, sender),
+            name=f"pydlfmt-{fmt}",
+        )
+        process.start()
+        sender.close()
+        workers[fmt] = (process, receiver)
+
+    results = {}
+    errors = []
+    for fmt, (process, receiver) in workers.items():
+        try:
+            result = receiver.recv()
+        except EOFError:
+            result = None
+        process.join()
+        receiver.close()
+
+        if result is None:
+            errors.append(
+                (RuntimeError(f"the {fmt} worker exited with code {process.exitcode}"), None)
+            )
+        elif result[0] == "ok":
+            results[fmt] = result[1]
+        else:
+            errors.append((result[1], result[2]))
+
+    if errors:
+        error, text = errors[0]
+        if text:
+            raise error from WorkerTraceback(text)
+        raise error
+    return results
@@ -0,0 +1,684 @@
+import copy
+import datetime
+from collections.abc import Sequence
+from decimal import ROUND_HALF_UP, Decimal
+from itertools import chain, islice
+
+from reportlab.lib import colors, pagesizes
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.pdfbase import pdfmetrics  # noqa: F401
+from reportlab.platypus import (  # noqa: F401
+    BaseDocTemplate,
+    SimpleDocTemplate,
+    Paragraph,
+    PageBreak,
+    Spacer,
+    PageTemplate,
+    FrameBreak,
+    Table,
+    TableStyle,
+    Frame,
+)
+from reportlab.lib.enums import TA_CENTER, TA_RIGHT
+from reportlab.platypus.flowables import KeepTogether  # noqa: F401
+
+from . import ReportSection
+from .accessors import build_getters, peek
+from .aggregates import Aggregator
+from .columnar import ColumnarData, read_source
+from .flowables import LazyTable
+from .formatters import compile_columns
+from .resources import FontMetrics, get_stylesheet, register_fonts
+from .progress import BuildCancelled, Progress, output_state, remove_output
+from .stats import BuildStats, run_hooks
+from .widths import FIRST, SAMPLE, WidthEstimator
+
+
+FORMAT_INT = "{0:,.0f}"
+#  default left + right padding reportlab puts around a table cell
+CELL_PADDING = 12
+
+
+class CellFit:
+    """
+    decides whether a plain string cell fits its column or needs a Paragraph
+    so it can wrap.  until the column widths are known every cell fits, the
+    rows seen before that are checked with wrap_row
+    """
+
+    def __init__(self, columns, metrics, column_styles):
+        self.columns = columns
+        self.metrics = metrics
+        self.column_styles = column_styles
+        self.available = None
+
+    def set_widths(self, column_widths):
+        self.available = [x - CELL_PADDING for x in column_widths]
+
+    def fits(self, j, text):
+        #  always measured, the character count says nothing about the width
+        #  and the metrics cache each glyph's width
+        return self.available is None or self.metrics[j](text) <= self.available[j]
+
+    def wrap_row(self, rr):
+        for j, cell in enumerate(rr):
+            if isinstance(cell, str) and cell and not self.fits(j, cell):
+                rr[j] = Paragraph(cell, style=self.column_styles[j])
+
+
+class PDFReport:
+    def __init__(
+        self,
+        data=None,
+        sections=None,
+        headings=None,
+        orientation="letter",
+        scalar_heading_column=1,
+        filename="pdf_report.pdf",
+        username=None,
+        date_format="%m/%d/%Y",
+        include_column_headers=True,  # used only if sections is None
+        font_family="Arial",
+        font_files=None,  # dict of normal, bold, italic, bold_italic TTF files
+        width_strategy=FIRST,
+    ):
+        self.headings = headings
+        self.orientation = orientation
+        self.data = data
+        self.scalar_heading_column = scalar_heading_column
+        #  file name or a writable binary file-like object
+        self.filename = filename
+        self.username = username
+        self.sections = sections
+        self.include_column_headers = include_column_headers
+        self.inch = inch
+        self.Paragraph = Paragraph
+
+        #  Report Setup - fonts are only loaded the first time they're used
+        #  in the process, falling back to Helvetica if they can't be found
+        font_names = register_fonts(font_family, font_files)
+        self.base_font = font_names["normal"]
+        self.bold_font = font_names["bold"]
+        self.italic_font = font_names["italic"]
+        self.bold_italic_font = font_names["bold_italic"]
+
+        self.PAGE_HEIGHT = pagesizes.letter[1]
+        self.PAGE_WIDTH = pagesizes.letter[0]
+
+        self.DETAIL_STYLE = TableStyle(
+            [
+                ("GRID", (0, 0), (-1, -1), 0.25, colors.gray),
+                ("FONTNAME", (0, 0), (-1, -1), self.base_font),
+                ("FONTSIZE", (0, 0), (-1, -1), 8),
+                ("BACKGROUND", (0, 0), (-1, 0), colors.transparent),
+                ("TEXTCOLOR", (0, 0), (-1, 0), colors.black),
+                ("ALIGNMENT", (0, 0), (-1, 0), "CENTER"),  # Center all Headings
+                (
+                    "ALIGNMENT",
+                    (0, 1),
+                    (-1, -1),
+                    "LEFT",
+                ),  # Left justify all remaining
+                ("VALIGN", (0, 1), (-1, -1), "TOP"),
+                ("VALIGN", (0, 0), (-1, 0), "BOTTOM"),
+            ]
+        )
+
+        self.DEFAULT_TABLE_STYLE = [
+            ("GRID", (0, 0), (-1, -1), 0.25, colors.gray),
+            ("FONTNAME", (0, 0), (-1, -1), self.base_font),
+            ("FONTSIZE", (0, 0), (-1, -1), 8),
+            ("BACKGROUND", (0, 0), (-1, 0), colors.transparent),
+            ("TEXTCOLOR", (0, 0), (-1, 0), colors.black),
+            ("ALIGNMENT", (0, 0), (-1, 0), "CENTER"),  # Center all Headings
+            ("ALIGNMENT", (0, 1), (-1, -1), "LEFT"),  # Left justify all remaining
+            ("VALIGN", (0, 1), (-1, -1), "TOP"),
+            ("VALIGN", (0, 0), (-1, 0), "BOTTOM"),
+        ]
+
+        self.HEADER_STYLE = TableStyle(
+            [
+                # ("GRID", (0, 0), (-1, -1), 0.25, colors.gray),
+                ("FONTNAME", (0, 0), (-1, -1), self.base_font),
+                ("FONTSIZE", (0, 0), (-1, -1), 10),
+                ("FONTSIZE", (1, 1), (1, -1), 12),
+                ("FONTSIZE", (1, 0), (1, 0), 16),
+                ("BACKGROUND", (0, 0), (-1, 0), colors.transparent),
+                ("TEXTCOLOR", (0, 0), (-1, 0), colors.black),
+                ("ALIGNMENT", (0, 0), (0, -1), "LEFT"),
+                ("ALIGNMENT", (1, 0), (1, -1), "CENTER"),
+                ("ALIGNMENT", (2, 0), (2, -1), "RIGHT"),
+                # ("BOTTOMPADDING", (0, 0), (-1, 0), 0.1 * inch),
+                ("VALIGN", (0, 1), (-1, -1), "MIDDLE"),
+            ]
+        )
+
+        self.style = get_stylesheet()
+        self.styleN = self.style["Normal"]
+        self.styleH = self.style["Heading1"]
+        self.styleH2 = self.style["Heading2"]
+        self.style_center = get_stylesheet()
+        self.style_center_n = self.style_center["Normal"]
+        self.style_center_n.alignment = TA_CENTER
+        self.style_center_h = self.style_center["Heading1"]
+        self.style_center_h.alignment = TA_CENTER
+        self.style_right = get_stylesheet()
+        self.style_right_n = self.style_right["Normal"]
+        self.style_right_n.alignment = TA_RIGHT
+        self.style_right_h = self.style_right["Heading1"]
+        self.style_center_h.alignment = TA_RIGHT
+        self.style_bullet = get_stylesheet()
+        self.style_bullet_n = self.style_bullet["Bullet"]
+        self.style_bullet_n.bulletFontName = "Symbol"
+        self.style_bullet_n.leftIndent = 10
+        #  (base style, font size): the column style derived from it
+        self.column_styles = {}
+
+        self.report_story = []
+        self.header_story = []
+
+        self.row_heights = []
+        self.report_period = ""
+
+        if not self.headings:
+            self.headings = ["QLF PDF Report"]
+
+        self.report_story = []
+        self.columns = []
+        self.doc = None
+
+        if self.orientation.upper() == "LANDSCAPE":
+            self.pagesize = pagesizes.landscape(pagesizes.letter)
+        else:
+            self.pagesize = pagesizes.letter
+
+        self.top_margin = 1.25 * inch + (0.5 * len(self.headings) - 1) * inch
+        self.bottom_margin = 0.5 * inch
+        self.left_margin = 0.5 * inch
+        self.right_margin = 0.5 * inch
+
+        self.date_format = date_format
+
+        #  column widths are measured over the first width_sample_rows rows of
+        #  a section.  widths.EXACT measures every row, holding the section in
+        #  memory, and widths.SAMPLE a random sample of rows from a list
+        self.width_strategy = width_strategy
+        self.width_sample_rows = 1000
+        #  detail rows pulled from the data at a time while laying out a page
+        self.chunk_rows = 100
+        #  BuildStats of the last build.  hooks are called with it when a
+        #  build is done, trace_memory records its peak allocations
+        self.stats = BuildStats("pdf")
+        self.hooks = []
+        self.trace_memory = False
+        #  progress(rows, section, phase) is called every progress_interval
+        #  rows of a section.  cancel_token stops the build, see progress.py
+        self.progress = None
+        self.progress_interval = 1000
+        self.cancel_token = None
+        self.tracker = Progress()
+
+    def setup_document(self):
+        self.PAGE_HEIGHT = self.pagesize[1]
+        self.PAGE_WIDTH = self.pagesize[0]
+
+        self.doc = SimpleDocTemplate(
+            self.filename,
+            pagesize=self.pagesize,
+            topMargin=self.top_margin,
+            bottomMargin=self.bottom_margin,
+            leftMargin=self.left_margin,
+            rightMargin=self.right_margin,
+        )
+
+    def first_page(self, canvas, doc):
+        """
+        handle layout of the first page of the report
+
+        NOTE: override this method to put custom headers in place
+
+        Args:
+            canvas (_type_): _description_
+            doc (_type_): _description_
+        """
+        canvas.saveState()
+
+        #  Print the headings
+        header_data = []
+        for i, heading in enumerate(self.headings):
+            column_3 = ""
+            if i == 0 and self.username:
+                column_3 = f"Printed by: {self.username}"
+            elif i == len(self.headings) - 1:
+                column_3 = (
+                    f"Printed: {datetime.date.today().strftime(self.date_format)}"
+                )
+            header_data.append(
+                [
+                    "",
+                    heading,
+                    column_3,
+                ]
+            )
+
+        col_width = (self.PAGE_WIDTH - 1.0 * inch) / 3
+        header_col_widths = (col_width, col_width, col_width)
+
+        header_frame = Frame(
+            x1=0.5 * inch,
+            y1=self.PAGE_HEIGHT - 1.5 * inch,
+            width=self.PAGE_WIDTH - 1.0 * inch,
+            height=1 * inch,
+        )
+        header_table = Table(header_data, header_col_widths)
+        header_table.setStyle(self.HEADER_STYLE)
+        self.header_story.append(header_table)
+        header_frame.addFromList(self.header_story, canvas)
+
+        #  Print the page number
+        canvas.setFont(self.base_font, 8)
+        canvas.drawRightString(
+            self.PAGE_WIDTH - 0.5 * inch, 0.4 * inch, "Page %d" % doc.page
+        )
+        canvas.restoreState()
+
+    def subsequent_pages(self, canvas, doc):
+        self.first_page(canvas, doc)
+
+    def pre_build(self):
+        pass
+
+    def post_build(self):
+        pass
+
+    def build(self):
+        """
+        Returns:
+            BuildStats: where the build's time went
+        """
+        self.stats = BuildStats("pdf", self.trace_memory)
+        self.tracker = Progress(
+            self.progress, self.progress_interval, self.cancel_token
+        )
+        state = output_state(self.filename)
+        self.stats.begin()
+        try:
+            self.tracker.update(0, None, "setup")
+            with self.stats.phase("setup"):
+                self.setup_document()
+
+                self.pre_build()
+
+            first, rows = peek(read_source(self.columns, self.data))
+            if first is not None:
+                self.build_section(
+                    ReportSection(
+                        header="",
+                        columns=self.columns,
+                        data=rows,
+                        include_column_headers=self.include_column_headers,
+                    )
+                )
+            else:
+                for section in self.sections:
+                    self.build_section(section)
+
+            self.post_build()
+            self.tracker.update(0, None, "layout")
+
+            #  the detail rows are formatted as the pages are laid out, that
+            #  time is counted as format and paragraphs rather than layout
+            with self.stats.phase("layout"):
+                self.doc.build(
+                    self.report_story,
+                    onFirstPage=self.first_page,
+                    onLaterPages=self.subsequent_pages,
+                )
+            self.stats.count("pages", self.doc.page)
+        except BuildCancelled:
+            remove_output(self.filename, state)
+            raise
+        finally:
+            self.stats.end()
+        run_hooks(self.stats, self.hooks)
+        return self.stats
+
+    def build_section(self, section):
+        self.stats.count("sections")
+        self.stats.start("prepare")
+        section_index = self.tracker.next_section()
+        if section.header and section.header != "":
+            self.report_story.append(Paragraph(section.header, style=self.styleH2))
+        else:
+            self.report_story.append(Spacer(1, section.space_before))
+
+        #  formula columns are spreadsheet only.  the section is copied rather
+        #  than changed, its columns can be shared with other reports
+        section = copy.copy(section)
+        section.columns = [x for x in section.columns if not x.excel_formula]
+
+        #  column defaults are applied through the table style so they cover
+        #  the plain string cells as well as the Paragraph cells
+        table_style = list(
+            section.tablestyle if section.tablestyle else self.DEFAULT_TABLE_STYLE
+        )
+        for col_number, column in enumerate(section.columns):
+            #  add alignments from column defaults
+            justify = "RIGHT" if column.currency else column.justify
+            if justify != "LEFT":
+                table_style.append(
+                    ("ALIGNMENT", (col_number, 1), (col_number, -1), justify)
+                )
+            if column.font_size and column.font_size > 0:
+                table_style.append(
+                    (
+                        "FONTSIZE",
+                        (col_number, 1),
+                        (col_number, -1),
+                        column.font_size,
+                    )
+                )
+            if column.bold:
+                table_style.append(
+                    ("FONTNAME", (col_number, 1), (col_number, -1), self.bold_font)
+                )
+
+        #  cells only need a Paragraph for wrapping, markup or a custom style,
+        #  everything else is drawn as a plain string by the table
+        plain_columns = [
+            not column.wrap and not column.paragraph_style
+            for column in section.columns
+        ]
+
+        header_rows = []
+        if section.include_column_headers:
+            header_rows.append([x.heading for x in section.columns])
+
+        first, rows = peek(read_source(section.columns, section.data))
+        if first is not None:
+            formatters = compile_columns(section.columns)
+            aggregator = Aggregator(section.columns, formatters)
+            prepared = rows if isinstance(rows, ColumnarData) else None
+            if prepared is not None:
+                #  already extracted and formatted by DataFormatter.prepare()
+                prepared_indexes = prepared.indexes(section.columns)
+                records = prepared.records(section.columns)
+            else:
+                getters = build_getters(section.columns, first)
+                records = (([getter(row) for getter in getters], None) for row in rows)
+
+            def row_texts(index):
+                if prepared is not None:
+                    return [prepared.texts[i][index] for i in prepared_indexes]
+                values = [getter(rows[index]) for getter in getters]
+                return [
+                    formatter.prefix + formatter.format(value) if value else ""
+                    for formatter, value in zip(formatters, values)
+                ]
+
+            column_styles = [self._get_column_style(x) for x in section.columns]
+            metrics = [
+                FontMetrics(self.bold_font if x.bold else self.base_font, x.font_size)
+                for x in section.columns
+            ]
+            cell_fit = CellFit(section.columns, metrics, column_styles)
+
+            strategy = self.width_strategy
+            if strategy == SAMPLE and not isinstance(rows, Sequence):
+                #  an iterator can't be sampled before the table is laid out
+                strategy = FIRST
+            estimator = WidthEstimator(metrics, strategy, self.width_sample_rows)
+
+            #  prepared texts and sampled rows of a list are measured up front,
+            #  so no rows are held back waiting for the widths
+            measure_ahead = prepared is not None or estimator.strategy == SAMPLE
+            if measure_ahead:
+                with self.stats.phase("widths"):
+                    indexes = estimator.sample_indexes(len(rows))
+                    for index in range(len(rows)) if indexes is None else indexes:
+                        estimator.add(row_texts(index))
+
+            detail_rows = self.stats.timed(
+                "format",
+                self._detail_rows(
+                    section,
+                    self.tracker.rows(records, section_index, "format"),
+                    formatters,
+                    aggregator,
+                    plain_columns,
+                    column_styles,
+                    cell_fit,
+                    None if measure_ahead else estimator,
+                ),
+            )
+
+            #  column widths come from the rows the estimator measures, those
+            #  are held until the widths are known.  the rest are formatted
+            #  as the table is laid out by doc.build
+            with self.stats.phase("widths"):
+                if measure_ahead:
+                    sample = []
+                elif estimator.strategy == FIRST:
+                    sample = list(islice(detail_rows, self.width_sample_rows))
+                else:
+                    sample = list(detail_rows)
+                column_widths = self.get_column_widths(
+                    section.columns,
+                    [
+                        max(
+                            width + CELL_PADDING,
+                            metrics[j]("0" * max(10, column.max_width or 0)),
+                        )
+                        for j, (column, width) in enumerate(
+                            zip(section.columns, estimator.widths())
+                        )
+                    ],
+                )
+                cell_fit.set_widths(column_widths)
+                for rr in sample:
+                    cell_fit.wrap_row(rr)
+
+            def tail():
+                with self.stats.phase("scalars"):
+                    return self._scalar_rows(section, aggregator, formatters)
+
+            data_table = LazyTable(
+                header_rows,
+                chain(sample, detail_rows),
+                column_widths,
+                table_style,
+                tail=tail,
+                row_heights=self.row_heights if len(self.row_heights) > 0 else None,
+                chunk_rows=self.chunk_rows,
+            )
+            self.report_story.append(data_table)
+
+        if section.footer and section.footer != "":
+            self.report_story.append(Spacer(1, 0.1 * inch))
+            self.report_story.append(
+                Paragraph(
+                    section.footer,
+                    style=section.footer_style if section.footer_style else self.styleN,
+                )
+            )
+        else:
+            self.report_story.append(Spacer(1, section.space_after))
+
+        if section.pagebreak:
+            self.report_story.append(PageBreak())
+        self.stats.stop()
+
+    def _detail_rows(
+        self,
+        section,
+        records,
+        formatters,
+        aggregator,
+        plain_columns,
+        column_styles,
+        cell_fit,
+        estimator,
+    ):
+        """
+        generate the formatted table rows for the section's data, feeding the
+        raw values to the aggregator and the rows it wants to the width
+        estimator along the way.  records are (values, texts) for each row,
+        texts is None unless the data was prepared
+        """
+        stats = self.stats
+        row_count = 0
+        for values, prepared_texts in records:
+            row_count += 1
+            if aggregator:
+                aggregator.add(values)
+            texts = [] if estimator is not None and estimator.wants() else None
+
+            rr = []
+            for j, column in enumerate(section.columns):
+                value = values[j]
+                if value:
+                    if prepared_texts is not None:
+                        text = prepared_texts[j]
+                    else:
+                        formatter = formatters[j]
+                        text = formatter.prefix + formatter.format(value)
+                    if texts is not None:
+                        texts.append(text)
+                    if (
+                        plain_columns[j]
+                        and "<" not in text
+                        and "&" not in text
+                        and cell_fit.fits(j, text)
+                    ):
+                        rr.append(text)
+                    else:
+                        stats.start("paragraphs")
+                        rr.append(Paragraph(text, style=column_styles[j]))
+                        stats.stop()
+                        stats.count("paragraphs")
+                else:
+                    rr.append("")
+                    if texts is not None:
+                        texts.append("")
+
+            if texts is not None:
+                estimator.add(texts)
+            yield rr
+
+        stats.count("rows", row_count)
+        stats.count("cells", row_count * len(section.columns))
+
+    def _scalar_rows(self, section, aggregator, formatters):
+        report_data = []
+        for scalar in aggregator.scalars:
+            results = aggregator.results(scalar)
+            scalar_label_written = False
+            #  add summary row:
+            rr = []
+            for column_number, column in enumerate(section.columns):
+                if column_number in results:
+                    rr.append(
+                        self._format_scalar(
+                            scalar, results[column_number], formatters[column_number]
+                        )
+                    )
+                elif (
+                    not scalar_label_written
+                    and self.scalar_heading_column == (column_number + 1)
+                ):
+                    column_style = (
+                        column.paragraph_style if column.paragraph_style else self.styleN
+                    )
+                    rr.append(
+                        Paragraph(
+                            f"{scalar.replace('_', ' ')} {section.header}",
+                            style=column_style,
+                        )
+                    )
+                    scalar_label_written = True
+                else:
+                    rr.append("")
+            report_data.append(rr)
+        return report_data
+
+    @staticmethod
+    def _format_scalar(scalar, value, formatter):
+        if value is None:
+            return ""
+        if scalar == "TOTAL":
+            if formatter.places is not None:
+                return formatter.format(value)
+            return str(Decimal(value).quantize(Decimal("0.00"), rounding=ROUND_HALF_UP))
+        if scalar == "AVG":
+            return str(value.quantize(Decimal("0.00"), rounding=ROUND_HALF_UP))
+        if scalar in ["MIN", "MAX"]:
+            return formatter.format(value)
+        return str(value)
+
+    def _get_column_style(self, column):
+        """
+        the paragraph style for a column's cells, a child of its base style
+        with the column's font size.  styles are never changed once they're
+        made, so paragraphs can share them
+
+        Args:
+            column (Column): the column
+
+        Returns:
+            ParagraphStyle: style for the column's cells
+        """
+        column_style = (
+            column.paragraph_style if column.paragraph_style else self.styleN
+        )
+        if column.justify == "CENTER":
+            column_style = self.style_center_n
+        elif column.justify == "RIGHT" or column.currency:
+            column_style = self.style_right_n
+
+        #  the font the table draws the column's plain cells in, so the cells
+        #  that need a Paragraph look the same.  a custom style keeps its own
+        font_name = None
+        if not column.paragraph_style:
+            font_name = self.bold_font if column.bold else self.base_font
+
+        key = (column_style, column.font_size, font_name)
+        sized_style = self.column_styles.get(key)
+        if sized_style is None:
+            sized_style = ParagraphStyle(
+                f"{column_style.name} {column.font_size} {font_name}",
+                parent=column_style,
+                fontSize=column.font_size,
+            )
+            if font_name:
+                sized_style.fontName = font_name
+            self.column_styles[key] = sized_style
+        return sized_style
+
+    def get_column_widths(self, columns=None, natural_widths=None):
+        """
+        share the page width between the columns
+
+        Args:
+            columns (list): Column objects, defaults to self.columns
+            natural_widths (list): width in points each column's text needs,
+                without them the columns are sized by max_width (characters)
+
+        Returns:
+            list: width in points of each column
+        """
+        if not columns:
+            columns = self.columns
+        if not natural_widths:
+            natural_widths = [x.max_width for x in columns]
+
+        column_widths = []
+
+        #  get total width
+        total_width = sum(natural_widths)
+        page_width = self.PAGE_WIDTH - self.left_margin - self.right_margin
+
+        for width in natural_widths:
+            column_widths.append(page_width * width / total_width)
+
+        return column_widths
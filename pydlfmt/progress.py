@@ -0,0 +1,134 @@
+"""
+progress reporting and cancellation
+
+a build calls its progress callback every `interval` rows of a section, and
+once more when the section's rows are done, with the rows processed so far
+in the section, the section's index and the phase the rows are in.  it's
+also called with 0 rows and no section when the build starts and before the
+output is laid out or closed, the phases that don't go row by row.  the
+cancel token is checked at the same points, so a cancelled build stops
+within `interval` rows, raises BuildCancelled and removes the output file it
+was writing
+"""
+import os
+import threading
+
+
+class BuildCancelled(Exception):
+    pass
+
+
+class CancelToken:
+    def __init__(self, event=None, parent=None):
+        """
+        Args:
+            event: the flag to check, a threading.Event when not passed.  use
+                a multiprocessing Event (e.g. multiprocessing.Manager().Event())
+                for builds in other processes
+            parent (CancelToken): this token is also cancelled when the parent
+                is, but cancelling it leaves the parent alone
+        """
+        self.event = event if event is not None else threading.Event()
+        self.parent = parent
+
+    def cancel(self):
+        """
+        stop the builds using this token, from any thread
+        """
+        self.event.set()
+
+    @property
+    def cancelled(self):
+        return self.event.is_set() or (
+            self.parent is not None and self.parent.cancelled
+        )
+
+    def check(self):
+        if self.cancelled:
+            raise BuildCancelled("the build was cancelled")
+
+
+class Progress:
+    def __init__(self, callback=None, interval=1000, token=None):
+        """
+        Args:
+            callback: callable taking (rows, section, phase)
+            interval (int): rows between callbacks
+            token (CancelToken): checked with each callback
+        """
+        self.callback = callback
+        self.interval = max(1, interval or 1)
+        self.token = token
+        self.sections = 0
+
+    def next_section(self):
+        """
+        Returns:
+            int: index of the section being built
+        """
+        self.sections += 1
+        return self.sections - 1
+
+    def update(self, rows, section, phase):
+        if self.token is not None:
+            self.token.check()
+        if self.callback is not None:
+            self.callback(rows, section, phase)
+
+    def rows(self, iterable, section, phase):
+        """
+        report the progress of a row loop
+
+        Args:
+            iterable: the rows
+            section (int): index of the section
+            phase (str): what's being done with the rows
+
+        Yields:
+            the rows
+        """
+        if self.callback is None and self.token is None:
+            yield from iterable
+            return
+        interval = self.interval
+        row_count = 0
+        for row in iterable:
+            yield row
+            row_count += 1
+            if row_count % interval == 0:
+                self.update(row_count, section, phase)
+        if row_count % interval:
+            self.update(row_count, section, phase)
+
+
+def output_state(output):
+    """
+    Args:
+        output: file name or file-like object a build writes to
+
+    Returns:
+        the file's modification time and size, None when it isn't there or
+        isn't a file name
+    """
+    if not isinstance(output, (str, os.PathLike)):
+        return None
+    try:
+        stat = os.stat(output)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def remove_output(output, state):
+    """
+    remove the partial output of a cancelled build.  a file that was there
+    before the build is only removed if the build had started writing it,
+    file-like objects are left alone
+
+    Args:
+        output: file name or file-like object
+        state: output_state(output) from before the build
+    """
+    after = output_state(output)
+    if after is not None and after != state:
+        os.remove(output)
@@ -0,0 +1,149 @@
+"""
+process-wide PDF resources
+
+fonts are registered with reportlab once per process, the first time a report
+needs them, the sample stylesheet is built once and copied for each report and
+glyph widths are cached per font as text is measured
+"""
+import threading
+import warnings
+from copy import copy
+
+import reportlab.rl_config
+from reportlab.lib import fonts, styles
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFError, TTFont
+
+#  TTF files for each face of the default font family, searched for on
+#  reportlab's TTFSearchPath.  change these (or pass font_files to PDFReport)
+#  to point at the files on your system
+FONT_FILES = dict(
+    normal="arial.ttf",
+    bold="arialbd.ttf",
+    italic="ariali.ttf",
+    bold_italic="arialbi.ttf",
+)
+
+#  built-in font names used when the TTF files can't be loaded
+FALLBACK_FONTS = dict(
+    normal="Helvetica",
+    bold="Helvetica-Bold",
+    italic="Helvetica-Oblique",
+    bold_italic="Helvetica-BoldOblique",
+)
+
+_lock = threading.RLock()
+_registered = {}
+_stylesheet = None
+#  font name: {character: width at 1000 points}
+_glyph_widths = {}
+
+
+def register_fonts(family="Arial", font_files=None):
+    """
+    register the faces of a TTF font family with reportlab
+
+    only the first call for a family/files combination does any work, later
+    calls return the cached result
+
+    Args:
+        family (str): font family name to register the faces under
+        font_files (dict): normal, bold, italic and bold_italic TTF files,
+            defaults to FONT_FILES
+
+    Returns:
+        dict: reportlab font names for the normal, bold, italic and
+            bold_italic faces.  the Helvetica family if the files can't be found
+    """
+    font_files = font_files or FONT_FILES
+    key = (family, tuple(sorted(font_files.items())))
+    font_names = _registered.get(key)
+    if font_names is not None:
+        return font_names
+
+    with _lock:
+        font_names = _registered.get(key)
+        if font_names is not None:
+            return font_names
+
+        reportlab.rl_config.warnOnMissingFontGlyphs = 0
+        font_names = dict(
+            normal=family,
+            bold=f"{family} Bold",
+            italic=f"{family} Italic",
+            bold_italic=f"{family} Bold Italic",
+        )
+        try:
+            faces = [
+                TTFont(font_names[face], font_files[face]) for face in FALLBACK_FONTS
+            ]
+        except (TTFError, OSError, KeyError) as e:
+            warnings.warn(
+                f"unable to load the {family} fonts ({e}), using Helvetica instead"
+            )
+            font_names = dict(FALLBACK_FONTS)
+        else:
+            for face in faces:
+                pdfmetrics.registerFont(face)
+            fonts.addMapping(family, 0, 0, font_names["normal"])
+            fonts.addMapping(family, 0, 1, font_names["italic"])
+            fonts.addMapping(family, 1, 0, font_names["bold"])
+            fonts.addMapping(family, 1, 1, font_names["bold_italic"])
+
+        _registered[key] = font_names
+        return font_names
+
+
+def get_stylesheet():
+    """
+    get a private copy of reportlab's sample stylesheet
+
+    the sample stylesheet is only built once, each call returns a new
+    StyleSheet1 holding copies of its styles so they can be changed freely
+
+    Returns:
+        StyleSheet1: stylesheet with the sample styles
+    """
+    global _stylesheet
+    if _stylesheet is None:
+        with _lock:
+            if _stylesheet is None:
+                _stylesheet = styles.getSampleStyleSheet()
+
+    stylesheet = styles.StyleSheet1()
+    for name, style in _stylesheet.byName.items():
+        stylesheet.byName[name] = copy(style)
+    for alias, style in _stylesheet.byAlias.items():
+        stylesheet.byAlias[alias] = stylesheet.byName[style.name]
+    return stylesheet
+
+
+class FontMetrics:
+    """
+    measures text in a font and size, character widths are looked up once per
+    font and cached for every size
+    """
+
+    def __init__(self, font_name, font_size):
+        self.font_name = font_name
+        self.font_size = font_size
+        self.scale = font_size / 1000
+        self.glyphs = _glyph_widths.setdefault(font_name, {})
+
+    def __call__(self, text):
+        """
+        Args:
+            text (str): the text to measure
+
+        Returns:
+            float: width of the text in points
+        """
+        glyphs = self.glyphs
+        try:
+            return sum(map(glyphs.__getitem__, text)) * self.scale
+        except KeyError:
+            for character in set(text).difference(glyphs):
+                glyphs[character] = pdfmetrics.stringWidth(
+                    character, self.font_name, 1000
+                )
+            return sum(map(glyphs.__getitem__, text)) * self.scale
@@ -0,0 +1,181 @@
+"""
+columnar data sources - numpy structured arrays, pandas DataFrames and arrow
+tables / record batches
+
+these are read a whole column at a time instead of row by row: each column is
+taken as a numpy array, its values converted to python with tolist() and its
+display strings built by formatting the column in bulk.  numpy, pandas and
+pyarrow are never imported here - a source is recognised by the module of its
+type, so they're only loaded if the caller already passed such data
+"""
+from .accessors import MISSING
+
+
+def is_columnar(data):
+    """
+    Args:
+        data: the data passed to DataFormatter or a ReportSection
+
+    Returns:
+        bool: True for a numpy structured array, pandas DataFrame or arrow
+            Table/RecordBatch
+    """
+    kind = type(data)
+    package = kind.__module__.split(".")[0]
+    if package == "pandas":
+        return kind.__name__ == "DataFrame"
+    if package == "numpy":
+        return getattr(getattr(data, "dtype", None), "names", None) is not None
+    if package == "pyarrow":
+        return kind.__name__ in ["Table", "RecordBatch"]
+    return False
+
+
+def column_array(data, name):
+    """
+    Args:
+        data: a columnar source
+        name (str): column name
+
+    Returns:
+        numpy array of the column, None if the source doesn't have it
+    """
+    package = type(data).__module__.split(".")[0]
+    if package == "pandas":
+        return data[name].to_numpy() if name in data.columns else None
+    if package == "numpy":
+        return data[name] if name in data.dtype.names else None
+    if name not in data.schema.names:
+        return None
+    return data.column(name).to_numpy()
+
+
+def row_count(data):
+    if type(data).__module__.split(".")[0] == "pyarrow":
+        return data.num_rows
+    return len(data)
+
+
+def is_blank(value):
+    #  None, NaN, NaT and pandas.NA
+    return (
+        value is None
+        or (isinstance(value, float) and value != value)
+        or type(value).__name__ in ["NAType", "NaTType"]
+    )
+
+
+def read_columns(columns, data, formatters):
+    """
+    read the values and display strings of a columnar source
+
+    Args:
+        columns (list): Column objects
+        data: a columnar source
+        formatters (list): ColumnFormatter for each column
+
+    Returns:
+        tuple: (values, texts) - a list for each column
+    """
+    count = row_count(data)
+    values = []
+    texts = []
+    for column, formatter in zip(columns, formatters):
+        array = column_array(data, column.name)
+        if array is None:
+            values.append([MISSING] * count)
+            texts.append([""] * count)
+            continue
+        column_values, column_texts = read_array(array, formatter)
+        values.append(column_values)
+        texts.append(column_texts)
+    return values, texts
+
+
+def read_array(array, formatter):
+    """
+    Args:
+        array: numpy array holding one column
+        formatter (ColumnFormatter): the column's formatter
+
+    Returns:
+        tuple: (values, texts) for the column
+    """
+    import numpy
+
+    kind = array.dtype.kind
+    if kind == "M":
+        return _read_datetimes(numpy, array, formatter)
+    if kind in "iuf" and formatter.coerce is None:
+        return _read_numbers(numpy, array, formatter)
+
+    #  strings, objects and dates held as text - one value at a time, but
+    #  the date coercer memoizes repeated values
+    values = [None if is_blank(x) else x for x in array.tolist()]
+    if formatter.coerce is not None:
+        coerce = formatter.coerce
+        values = [coerce(x) if x else x for x in values]
+    prefix = formatter.prefix
+    texts = [prefix + formatter.format(x) if x else "" for x in values]
+    return values, texts
+
+
+def _read_numbers(numpy, array, formatter):
+    values = array.tolist()
+    missing = numpy.isnan(array) if array.dtype.kind == "f" else None
+
+    if formatter.places is None:
+        texts = list(map(str, values))
+    else:
+        #  str.format one value at a time - numpy.char.mod, pandas string
+        #  methods and building the digits with numpy were all slower, and
+        #  this is what the other sources do so the texts can't differ
+        texts = list(map(formatter.pattern.format, values))
+        #  values too large for the float fast path, ints included, and
+        #  rounding ties are formatted one at a time, the same as
+        #  ColumnFormatter.format()
+        limit = formatter.float_limit
+        with numpy.errstate(invalid="ignore"):
+            slow = (array <= -limit) | (array >= limit)
+            if missing is not None:
+                slow |= array * formatter.tie_scale % 10 == 5
+                slow &= ~missing
+        for i in numpy.flatnonzero(slow).tolist():
+            texts[i] = formatter.format(values[i])
+
+    if missing is not None and missing.any():
+        for i in numpy.flatnonzero(missing).tolist():
+            values[i] = None
+
+    #  zero and missing values are shown as empty cells
+    empty = array == 0
+    if missing is not None:
+        empty |= missing
+    if formatter.prefix:
+        texts = [formatter.prefix + x for x in texts]
+    for i in numpy.flatnonzero(empty).tolist():
+        texts[i] = ""
+    return values, texts
+
+
+def _read_datetimes(numpy, array, formatter):
+    missing = numpy.isnat(array)
+    values = array.astype("datetime64[us]").tolist()
+    if formatter.coerce is not None:
+        coerce = formatter.coerce
+        values = [coerce(x) if x is not None else None for x in values]
+
+    #  each distinct date is only formatted once
+    unique, inverse = numpy.unique(array, return_inverse=True)
+    unique_texts = numpy.array(
+        [
+            "" if x is None else formatter.format(x)
+            for x in unique.astype("datetime64[us]").tolist()
+        ],
+        dtype=object,
+    )
+    texts = unique_texts[inverse.reshape(-1)].tolist()
+    if missing.any():
+        for i in numpy.flatnonzero(missing).tolist():
+            texts[i] = ""
+    return values, texts
@@ -0,0 +1,187 @@
+"""
+build statistics
+
+every build records where its time went in a BuildStats - wall time per
+phase, row/cell/paragraph counts and, when tracemalloc is tracing, the peak
+of python allocations.  build() returns it, and it's passed to every hook
+when the build is done so it can be forwarded to other telemetry
+
+phase times are exclusive: time spent in a phase started inside another one
+(formatting rows while reportlab lays out the pages) is only counted once,
+for the inner phase
+
+tracemalloc's peak is process wide, so it only belongs to a build that ran
+on its own.  when builds overlap on several threads, none of them records a
+peak_allocated
+"""
+import threading
+import time
+import tracemalloc
+
+_hooks = []
+
+#  the builds running in the process, and whether one of them started
+#  tracemalloc - it's stopped when the last of them is done
+_lock = threading.Lock()
+_running = set()
+_started_tracing = False
+
+
+def add_hook(hook):
+    """
+    call hook(stats) at the end of every build in this process
+
+    Args:
+        hook: callable taking a BuildStats
+    """
+    _hooks.append(hook)
+
+
+def remove_hook(hook):
+    _hooks.remove(hook)
+
+
+class BuildStats:
+    def __init__(self, format, trace_memory=False):
+        """
+        Args:
+            format (str): pdf, xlsx, csv or jsonl
+            trace_memory (bool): start tracemalloc for the build if it isn't
+                already tracing, so peak_allocated is recorded.  ignored
+                while another build is running
+        """
+        self.format = format
+        self.trace_memory = trace_memory
+        #  phase name: seconds
+        self.phases = {}
+        #  rows, cells, sections, paragraphs, pages...
+        self.counts = {}
+        self.seconds = None
+        #  peak bytes allocated during the build, None unless tracemalloc
+        #  was tracing and no other build ran at the same time
+        self.peak_allocated = None
+
+        self._stack = []
+        self._started = None
+        #  another build ran at the same time
+        self._shared = False
+
+    def start(self, name):
+        """
+        start timing a phase, inside whatever phase is running
+        """
+        self._stack.append([name, time.perf_counter(), 0.0])
+
+    def stop(self):
+        """
+        stop timing the innermost phase
+        """
+        name, start, inner = self._stack.pop()
+        elapsed = time.perf_counter() - start
+        self.phases[name] = self.phases.get(name, 0.0) + elapsed - inner
+        if self._stack:
+            self._stack[-1][2] += elapsed
+
+    def phase(self, name):
+        """
+        Returns:
+            context manager timing the phase
+        """
+        return _Phase(self, name)
+
+    def timed(self, name, iterable):
+        """
+        time each step of an iterable as a phase, for generators that are
+        consumed bit by bit by other code
+
+        Args:
+            name (str): phase name
+            iterable: the iterable to time
+
+        Yields:
+            the iterable's items
+        """
+        iterator = iter(iterable)
+        while True:
+            self.start(name)
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                self.stop()
+            yield item
+
+    def count(self, name, n=1):
+        self.counts[name] = self.counts.get(name, 0) + n
+
+    def begin(self):
+        """
+        the build is starting
+        """
+        global _started_tracing
+        with _lock:
+            if _running:
+                #  the peak would be the other builds' as well
+                self._shared = True
+                for stats in _running:
+                    stats._shared = True
+            elif self.trace_memory and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                _started_tracing = True
+            elif tracemalloc.is_tracing() and hasattr(tracemalloc, "reset_peak"):
+                tracemalloc.reset_peak()
+            _running.add(self)
+        self._started = time.perf_counter()
+
+    def end(self):
+        """
+        the build is done, or has failed
+        """
+        global _started_tracing
+        self.seconds = time.perf_counter() - self._started
+        self._stack = []
+        with _lock:
+            _running.discard(self)
+            if tracemalloc.is_tracing() and not self._shared:
+                self.peak_allocated = tracemalloc.get_traced_memory()[1]
+            if _started_tracing and not _running:
+                tracemalloc.stop()
+                _started_tracing = False
+
+    def as_dict(self):
+        return dict(
+            format=self.format,
+            seconds=self.seconds,
+            phases=dict(self.phases),
+            counts=dict(self.counts),
+            peak_allocated=self.peak_allocated,
+        )
+
+    def __repr__(self):
+        phases = ", ".join(f"{k}={v:.3f}s" for k, v in self.phases.items())
+        return f"<BuildStats {self.format} {self.seconds or 0:.3f}s {phases}>"
+
+
+class _Phase:
+    def __init__(self, stats, name):
+        self.stats = stats
+        self.name = name
+
+    def __enter__(self):
+        self.stats.start(self.name)
+        return self.stats
+
+    def __exit__(self, *exc_info):
+        self.stats.stop()
+        return False
+
+
+def run_hooks(stats, hooks=None):
+    """
+    Args:
+        stats (BuildStats): the finished build's stats
+        hooks (list): the report's own hooks, run before the process-wide ones
+    """
+    for hook in list(hooks or []) + _hooks:
+        hook(stats)
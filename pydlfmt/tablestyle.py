@@ -0,0 +1,187 @@
+"""
+tablestyle index for xlsx output
+
+reportlab TableStyle commands are compiled once per section into lookups that
+the xlsx writer can query per row/cell without rescanning the command list.
+
+supported commands:
+    BACKGROUND        ("BACKGROUND", (c0, r0), (c1, r1), color)
+                      a gradient ["HORIZONTAL", color, ...] gets its first color
+    ROWBACKGROUNDS    ("ROWBACKGROUNDS", (c0, r0), (c1, r1), [color, color, ...])
+    COLBACKGROUNDS    ("COLBACKGROUNDS", (c0, r0), (c1, r1), [color, color, ...])
+    TEXTCOLOR         ("TEXTCOLOR", (c0, r0), (c1, r1), color)
+
+coordinates follow reportlab - (column, row), row 0 is the heading row and
+negative values count back from the last column/row.  other commands are
+ignored, they only mean something to the pdf renderer.
+"""
+from bisect import bisect_right
+
+EMPTY = {}
+
+
+class TableStyleIndex:
+    def __init__(self, tablestyle, column_count, row_count=None):
+        """
+        compile tablestyle commands
+
+        Args:
+            tablestyle (list): reportlab style commands
+            column_count (int): number of columns in the table
+            row_count (int): number of rows in the table including the heading
+                row and the PDF's scalar rows, None when it isn't known up
+                front (streamed data).  in that case negative end rows run to
+                the end of the data
+        """
+        self.column_count = column_count
+        self.row_count = row_count
+
+        #  {row: {col: props}} for commands covering a single cell
+        self.cells = {}
+        #  (r0, r1, c0, c1, props, band) for commands covering ranges
+        self.ranges = []
+
+        for command in tablestyle or []:
+            self._compile(command)
+
+        self.boundaries = sorted(
+            {x[0] for x in self.ranges} | {x[1] + 1 for x in self.ranges}
+        )
+        self.segments = {}
+        self.row_cache = {}
+
+    def __bool__(self):
+        return bool(self.cells or self.ranges)
+
+    def row(self, row):
+        """
+        get the styles for a table row
+
+        Args:
+            row (int): table row number (0 is the heading row)
+
+        Returns:
+            dict: {column number: props} where props is a hashable tuple of
+                xlsxwriter format properties.  do not modify the result
+        """
+        rules = self._segment(row)
+        if rules:
+            phases = tuple((row - rule[0]) % len(rule[5]) for rule in rules if rule[5])
+            key = (id(rules), phases)
+            styles = self.row_cache.get(key)
+            if styles is None:
+                styles = self._merge(rules, row)
+                self.row_cache[key] = styles
+        else:
+            styles = EMPTY
+
+        cells = self.cells.get(row)
+        if cells:
+            merged = {col: dict(props) for col, props in styles.items()}
+            for col, props in cells.items():
+                merged.setdefault(col, {}).update(props)
+            styles = {col: _freeze(props) for col, props in merged.items()}
+        return styles
+
+    def _segment(self, row):
+        i = bisect_right(self.boundaries, row)
+        rules = self.segments.get(i)
+        if rules is None:
+            rules = tuple(x for x in self.ranges if x[0] <= row <= x[1])
+            self.segments[i] = rules
+        return rules
+
+    @staticmethod
+    def _merge(rules, row):
+        merged = {}
+        for r0, r1, c0, c1, props, band in rules:
+            if band:
+                props = band[(row - r0) % len(band)]
+                if props is None:
+                    continue
+            for col in range(c0, c1 + 1):
+                merged.setdefault(col, {}).update(props)
+        return {col: _freeze(props) for col, props in merged.items()}
+
+    def _compile(self, command):
+        try:
+            name, start, stop, value = command[0].upper(), command[1], command[2], command[3]
+            c0, r0 = start
+            c1, r1 = stop
+        except (IndexError, TypeError, ValueError, AttributeError):
+            return
+        if not all(isinstance(x, int) for x in (c0, r0, c1, r1)):
+            #  "splitfirst"/"splitlast" and friends only apply to pdf
+            return
+
+        c0, c1 = self._column(c0), self._column(c1)
+        r0, r1 = self._row(r0, start=True), self._row(r1, start=False)
+        if r0 is None or r1 is None or c0 > c1 or r0 > r1:
+            return
+
+        band = None
+        if name == "BACKGROUND":
+            props = _color_props("bg_color", value)
+        elif name == "TEXTCOLOR":
+            props = _color_props("font_color", value)
+        elif name == "ROWBACKGROUNDS":
+            props = None
+            band = tuple(_color_props("bg_color", x) for x in value or [])
+        elif name == "COLBACKGROUNDS":
+            #  column banding is static per column, expand it into ranges
+            bands = [_color_props("bg_color", x) for x in value or []]
+            if bands:
+                for col in range(c0, c1 + 1):
+                    props = bands[(col - c0) % len(bands)]
+                    if props:
+                        self._add(r0, r1, col, col, props, None)
+            return
+        else:
+            return
+
+        if props or (band and any(band)):
+            self._add(r0, r1, c0, c1, props, band)
+
+    def _add(self, r0, r1, c0, c1, props, band):
+        if r0 == r1 and c0 == c1 and not band:
+            self.cells.setdefault(r0, {}).setdefault(c0, {}).update(props)
+        else:
+            self.ranges.append((r0, r1, c0, c1, props, band))
+
+    def _column(self, col):
+        return col + self.column_count if col < 0 else col
+
+    def _row(self, row, start):
+        if row >= 0:
+            return row
+        if self.row_count is not None:
+            return row + self.row_count
+        #  unknown length - -1 as an end row means "through the last row"
+        return float("inf") if not start and row == -1 else None
+
+
+def _freeze(props):
+    return tuple(sorted(props.items()))
+
+
+def _color_props(key, color):
+    value = _hex_color(color)
+    return {key: value} if value else None
+
+
+def _hex_color(color):
+    if color is None:
+        return None
+    if isinstance(color, str):
+        return color
+    if isinstance(color, (list, tuple)):
+        #  a gradient - ["HORIZONTAL", color, color, ...], excel gets its
+        #  first color
+        return _hex_color(color[1]) if len(color) > 1 else None
+    if not hasattr(color, "hexval"):
+        #  not a reportlab color
+        return None
+    if getattr(color, "alpha", 1) == 0:
+        #  colors.transparent - nothing to paint in excel
+        return None
+    return color.hexval().replace("0x", "#")
@@ -0,0 +1,423 @@
+"""
+streaming CSV and JSON lines output
+
+CSVReport and JSONLReport write each row as soon as it's read, through a
+buffered file, so the table is never held in memory.  cells are formatted by
+the same ColumnFormatter as the PDF and XLSX output - rounding, currency and
+date formats.  the totals rows aren't written, these files are meant to be
+read by other programs
+"""
+import codecs
+import csv
+import io
+import os
+from contextlib import contextmanager
+from decimal import Decimal
+from json.encoder import encode_basestring
+
+from . import ExcelFormula, ReportSection
+from .accessors import build_getters, peek
+from .columnar import ColumnarData, read_source
+from .formatters import compile_columns
+from .progress import BuildCancelled, Progress, output_state, remove_output
+from .stats import BuildStats, run_hooks
+from .widths import LINE_BREAK
+
+#  size of the write buffer of files opened by name
+BUFFER_SIZE = 1 << 16
+
+
+class TextReport:
+    #  output format name, for the stats
+    format = None
+
+    def __init__(
+        self,
+        data=None,
+        sections=None,
+        filename=None,
+        include_column_headers=True,
+        encoding="utf-8",
+    ):
+        """
+        Args:
+            data: list of rows or any iterable of rows
+            sections (list): ReportSection objects, used when there is no data
+            filename: file name, or a text or binary file-like object
+            include_column_headers (bool): write the headings before the rows
+            encoding (str): encoding of files and binary streams
+        """
+        self.data = data
+        self.sections = sections
+        self.filename = filename
+        self.include_column_headers = include_column_headers
+        self.encoding = encoding
+
+        self.columns = []
+        self.output = None
+        #  BuildStats of the last build, see PDFReport
+        self.stats = BuildStats(self.format)
+        self.hooks = []
+        self.trace_memory = False
+        #  progress(rows, section, phase) is called every progress_interval
+        #  rows of a section.  cancel_token stops the build, see progress.py
+        self.progress = None
+        self.progress_interval = 1000
+        self.cancel_token = None
+        self.tracker = Progress()
+
+    def pre_build(self):
+        pass
+
+    def post_build(self):
+        pass
+
+    def build(self):
+        """
+        Returns:
+            BuildStats: where the build's time went
+        """
+        self.stats = BuildStats(self.format, self.trace_memory)
+        self.tracker = Progress(
+            self.progress, self.progress_interval, self.cancel_token
+        )
+        state = output_state(self.filename)
+        self.stats.begin()
+        try:
+            self.tracker.update(0, None, "setup")
+            with open_text(self.filename, self.encoding) as output:
+                self.output = output
+                self.pre_build()
+
+                first, rows = peek(read_source(self.columns, self.data))
+                if first is not None:
+                    self.build_section(
+                        ReportSection(
+                            header="",
+                            columns=self.columns,
+                            data=rows,
+                            include_column_headers=self.include_column_headers,
+                        )
+                    )
+                else:
+                    for section in self.sections or []:
+                        self.build_section(section)
+
+                self.post_build()
+                self.output = None
+        except BuildCancelled:
+            remove_output(self.filename, state)
+            raise
+        finally:
+            self.stats.end()
+        run_hooks(self.stats, self.hooks)
+        return self.stats
+
+    def count_rows(self, section, records):
+        """
+        count the rows of a section into the stats as they go by
+
+        Args:
+            section (ReportSection): the section
+            records: iterable of row values
+        """
+        self.stats.count("sections")
+        section_index = self.tracker.next_section()
+        row_count = 0
+        for values in self.tracker.rows(records, section_index, "write"):
+            row_count += 1
+            yield values
+        self.stats.count("rows", row_count)
+        self.stats.count("cells", row_count * len(section.columns))
+
+    def build_section(self, section):
+        raise NotImplementedError
+
+
+class CSVReport(TextReport):
+    """
+    each section is written after the one before it, with its own heading row
+    """
+
+    format = "csv"
+
+    def __init__(self, *args, dialect="excel", **kwargs):
+        """
+        Args:
+            dialect: csv dialect, see csv.writer
+        """
+        super().__init__(*args, **kwargs)
+        self.dialect = dialect
+
+    def build_section(self, section):
+        self.stats.start("write")
+        writer = csv.writer(self.output, self.dialect)
+        if section.include_column_headers:
+            writer.writerow([x.heading for x in section.columns])
+
+        cells = [
+            csv_cell(column, formatter)
+            for column, formatter in zip(
+                section.columns, compile_columns(section.columns)
+            )
+        ]
+        writer.writerows(
+            [cell(value) for cell, value in zip(cells, values)]
+            for values in self.count_rows(
+                section, read_records(section.columns, section.data)
+            )
+        )
+        self.stats.stop()
+
+
+class JSONLReport(TextReport):
+    """
+    one JSON object per row, keyed by column name
+
+    with typed=True rounded numbers are written as JSON numbers (currency
+    columns too, without the $), empty cells as null and dates as strings in
+    the column's date format.  with typed=False every cell is its display
+    string, the same as the CSV output
+    """
+
+    format = "jsonl"
+
+    def __init__(self, *args, typed=True, **kwargs):
+        """
+        Args:
+            typed (bool): write numbers as numbers, otherwise as display strings
+        """
+        kwargs.setdefault("include_column_headers", False)
+        super().__init__(*args, **kwargs)
+        self.typed = typed
+
+    def build_section(self, section):
+        self.stats.start("write")
+        keys = [encode_basestring(x.name) + ":" for x in section.columns]
+        cells = [
+            json_cell(column, formatter, self.typed)
+            for column, formatter in zip(
+                section.columns, compile_columns(section.columns)
+            )
+        ]
+        self.output.writelines(
+            "{%s}\n"
+            % ",".join([key + cell(value) for key, cell, value in zip(keys, cells, values)])
+            for values in self.count_rows(
+                section, read_records(section.columns, section.data)
+            )
+        )
+        self.stats.stop()
+
+
+@contextmanager
+def open_text(output, encoding):
+    """
+    Args:
+        output: file name, or a text or binary file-like object
+        encoding (str): encoding of files and binary streams
+
+    Yields:
+        text stream to write to, file-like objects are left open
+    """
+    if isinstance(output, (str, os.PathLike)):
+        with open(
+            output, "w", encoding=encoding, newline="", buffering=BUFFER_SIZE
+        ) as f:
+            yield f
+    elif is_binary(output):
+        try:
+            f = io.TextIOWrapper(output, encoding=encoding, newline="")
+        except AttributeError:
+            #  streams without the whole io interface, SpooledTemporaryFile
+            #  before 3.11 has no seekable()
+            yield codecs.getwriter(encoding)(output)
+            return
+        try:
+            yield f
+        finally:
+            f.flush()
+            f.detach()
+    else:
+        yield output
+
+
+def is_binary(output):
+    """
+    Args:
+        output: file-like object
+
+    Returns:
+        bool: True when bytes have to be written to it.  wrappers that aren't
+            io classes (NamedTemporaryFile, SpooledTemporaryFile) go by their mode
+    """
+    if isinstance(output, io.TextIOBase):
+        return False
+    if isinstance(output, (io.RawIOBase, io.BufferedIOBase)):
+        return True
+    mode = getattr(output, "mode", None)
+    return isinstance(mode, str) and "b" in mode
+
+
+def read_records(columns, data):
+    """
+    Args:
+        columns (list): Column objects
+        data: the section's data
+
+    Returns:
+        iterable: the values of each row, in column order
+    """
+    first, rows = peek(read_source(columns, data))
+    if first is None:
+        return ()
+    if isinstance(rows, ColumnarData):
+        return zip(*[rows.values[i] for i in rows.indexes(columns)])
+    getters = build_getters(columns, first)
+    return ([getter(row) for getter in getters] for row in rows)
+
+
+def csv_cell(column, formatter):
+    """
+    Args:
+        column (Column): the column
+        formatter (ColumnFormatter): its formatter
+
+    Returns:
+        function: cell value -> display string
+    """
+    if column.excel_formula:
+        return lambda value: ""
+
+    if formatter.places is None and formatter.coerce is None and not formatter.prefix:
+        #  csv.writer converts anything that isn't a string itself
+        def plain_cell(value):
+            if type(value) is str:
+                return value.replace(LINE_BREAK, "\n") if LINE_BREAK in value else value
+            if value is None or isinstance(value, ExcelFormula):
+                return ""
+            return value
+
+        return plain_cell
+
+    prefix = formatter.prefix
+    format_value = formatter.format
+
+    if formatter.coerce is not None:
+        return date_texts(format_value)
+
+    if formatter.places is None:
+
+        def cell(value):
+            if value is None or value == "" or isinstance(value, ExcelFormula):
+                return ""
+            return prefix + format_value(value)
+
+        return cell
+
+    pattern = formatter.pattern
+    limit = formatter.float_limit
+    tie_scale = formatter.tie_scale
+
+    def number_cell(value):
+        #  the fast path of ColumnFormatter.format(), without the call
+        kind = type(value)
+        if (
+            (kind is float or kind is int)
+            and -limit < value < limit
+            and value * tie_scale % 10 != 5
+        ):
+            return prefix + pattern.format(value)
+        if value is None or value == "" or isinstance(value, ExcelFormula):
+            return ""
+        return prefix + format_value(value)
+
+    return number_cell
+
+
+def date_texts(format_value, empty="", cache_size=10000):
+    """
+    Args:
+        format_value (function): the column's ColumnFormatter.format
+        empty (str): text for empty cells
+        cache_size (int): maximum number of memoized values
+
+    Returns:
+        function: cell value -> formatted date, memoized as dates repeat
+    """
+    cache = {}
+
+    def date_cell(value):
+        try:
+            return cache[value]
+        except KeyError:
+            pass
+        except TypeError:
+            #  unhashable, not a date
+            return format_value(value)
+        if value is None or value == "" or isinstance(value, ExcelFormula):
+            text = empty
+        else:
+            text = format_value(value)
+        if len(cache) >= cache_size:
+            cache.clear()
+        cache[value] = text
+        return text
+
+    return date_cell
+
+
+def json_cell(column, formatter, typed=True):
+    """
+    Args:
+        column (Column): the column
+        formatter (ColumnFormatter): its formatter
+        typed (bool): numbers as JSON numbers, otherwise the display string
+
+    Returns:
+        function: cell value -> JSON text
+    """
+    if column.excel_formula:
+        return lambda value: "null"
+
+    if not typed:
+        text = csv_cell(column, formatter)
+        return lambda value: encode_basestring(str(text(value)))
+
+    if formatter.places is not None:
+
+        def number_cell(value):
+            if value is None or value == "" or isinstance(value, ExcelFormula):
+                return "null"
+            number = formatter.number(value)
+            return encode_basestring(str(value)) if number is None else number
+
+        return number_cell
+
+    if formatter.coerce is not None:
+        text = date_texts(formatter.format, empty=None)
+
+        def date_cell(value):
+            value = text(value)
+            return "null" if value is None else encode_basestring(value)
+
+        return date_cell
+
+    return plain_json
+
+
+def plain_json(value):
+    kind = type(value)
+    if kind is str:
+        return encode_basestring(value.replace(LINE_BREAK, "\n"))
+    if value is None or isinstance(value, ExcelFormula):
+        return "null"
+    if kind is bool:
+        return "true" if value else "false"
+    if kind is int:
+        return str(value)
+    if kind is float:
+        return repr(value) if value - value == 0 else "null"
+    if kind is Decimal:
+        return str(value) if value.is_finite() else "null"
+    return encode_basestring(str(value))
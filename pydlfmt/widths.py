@@ -0,0 +1,154 @@
+"""
+column width estimation
+
+a WidthEstimator measures the display text of a section's cells and keeps the
+widest line seen in each column.  measuring every cell of a large section
+costs nearly as much as formatting it, so the rows that are measured depend on
+the strategy:
+
+    exact   every row
+    first   the first sample_rows rows
+    sample  a uniform random sample of sample_rows rows (reservoir sampling)
+
+text is measured with a callable per column - len for spreadsheet columns or
+resources.FontMetrics for PDF columns
+"""
+import math
+import random
+
+EXACT = "exact"
+FIRST = "first"
+SAMPLE = "sample"
+STRATEGIES = [EXACT, FIRST, SAMPLE]
+
+LINE_BREAK = "<br />"
+
+
+class WidthEstimator:
+    def __init__(self, measures, strategy=EXACT, sample_rows=1000, seed=None):
+        """
+        Args:
+            measures (list): callable returning the width of a line of text,
+                for each column
+            strategy (str): exact, first or sample
+            sample_rows (int): rows measured by the first and sample strategies
+            seed: random seed for the sample strategy
+        """
+        if strategy not in STRATEGIES:
+            raise ValueError(
+                f"unknown width strategy {strategy!r}, use one of {', '.join(STRATEGIES)}"
+            )
+        if strategy != EXACT and not sample_rows:
+            strategy = EXACT
+
+        self.measures = measures
+        self.strategy = strategy
+        self.sample_rows = sample_rows
+        self.random = random.Random(seed)
+        #  rows offered to wants() so far
+        self.seen = 0
+        #  widest line in each column over the measured rows
+        self.maximums = [0 for _ in measures]
+        #  line widths of the sampled rows, only combined by widths()
+        self.reservoir = []
+        self._slot = None
+        self._next = None
+        self._weight = None
+
+    def wants(self):
+        """
+        called once for each row, in order - should the row be measured?
+
+        Returns:
+            bool: True if the row's texts should be passed to add()
+        """
+        index = self.seen
+        self.seen += 1
+        if self.strategy == EXACT:
+            return True
+        if index < self.sample_rows:
+            if self.strategy == SAMPLE:
+                self._slot = index
+            return True
+        if self.strategy == FIRST:
+            return False
+
+        #  algorithm L - the number of rows to skip before the next one that
+        #  goes in the reservoir is drawn up front, so skipped rows cost nothing
+        if self._next is None:
+            self._weight = 1.0
+            self._advance(index - 1)
+        if index < self._next:
+            return False
+        self._slot = self.random.randrange(self.sample_rows)
+        self._advance(index)
+        return True
+
+    def _advance(self, index):
+        self._weight *= math.exp(math.log(self._uniform()) / self.sample_rows)
+        self._next = (
+            index
+            + int(math.log(self._uniform()) / math.log1p(-self._weight))
+            + 1
+            if self._weight < 1.0
+            else index + 1
+        )
+
+    def _uniform(self):
+        #  (0, 1], log() of it is always defined
+        return 1.0 - self.random.random()
+
+    def add(self, texts):
+        """
+        measure a row's texts
+
+        Args:
+            texts (list): display text for each column
+        """
+        widths = [
+            self.line_width(measure, text) if text else 0
+            for measure, text in zip(self.measures, texts)
+        ]
+        if self._slot is not None:
+            #  a row picked by wants() for the reservoir
+            if self._slot < len(self.reservoir):
+                self.reservoir[self._slot] = widths
+            else:
+                self.reservoir.append(widths)
+            self._slot = None
+        else:
+            self.maximums = list(map(max, self.maximums, widths))
+
+    def sample_indexes(self, row_count):
+        """
+        indexes of the rows to measure from a sequence of row_count rows, so
+        a sequence can be sampled without going through it.  the texts of
+        these rows are passed to add() without calling wants()
+
+        Args:
+            row_count (int): number of rows in the sequence
+
+        Returns:
+            list: the row indexes in order, None if every row is needed
+        """
+        if self.strategy == EXACT:
+            return None
+        if self.strategy == FIRST or row_count <= self.sample_rows:
+            return list(range(min(row_count, self.sample_rows)))
+        return sorted(self.random.sample(range(row_count), self.sample_rows))
+
+    def widths(self):
+        """
+        Returns:
+            list: widest line measured in each column
+        """
+        widths = self.maximums
+        for row in self.reservoir:
+            widths = list(map(max, widths, row))
+        return widths
+
+    @staticmethod
+    def line_width(measure, text):
+        if LINE_BREAK in text:
+            return max(measure(x) for x in text.split(LINE_BREAK))
+        return measure(text)
@@ -0,0 +1,466 @@
+from collections.abc import Sized
+from decimal import Decimal
+
+from xlsxwriter import Workbook
+from xlsxwriter.utility import xl_col_to_name
+
+from . import ExcelFormula, ReportSection
+from .accessors import build_getters, peek
+from .aggregates import Aggregator, is_blank
+from .columnar import ColumnarData, read_source
+from .formatters import compile_columns
+from .progress import BuildCancelled, Progress, output_state, remove_output
+from .stats import BuildStats, run_hooks
+from .tablestyle import EMPTY as EMPTY_STYLES, TableStyleIndex
+from .widths import EXACT, WidthEstimator
+
+
+#  SUBTOTAL function numbers for column scalars, 1xx ignores filtered rows
+SUBTOTAL_FUNCTIONS = dict(TOTAL=109, AVG=101, COUNT=103, MAX=104, MIN=105)
+#  worksheet functions for the totals row of a section that isn't a table
+SCALAR_FUNCTIONS = dict(
+    TOTAL="SUM", AVG="AVERAGE", COUNT="COUNTA", MAX="MAX", MIN="MIN"
+)
+#  total_function names for the total row of a table
+TABLE_FUNCTIONS = dict(
+    TOTAL="sum", AVG="average", COUNT="count", MAX="max", MIN="min"
+)
+#  there's no worksheet function for a distinct count
+COUNT_DISTINCT_FORMULA = '=SUMPRODUCT(({0}<>"")/COUNTIF({0},{0}&""))'
+
+
+class XLSXReport:
+    def __init__(
+        self,
+        data=None,
+        sections=None,
+        headings=None,
+        sheetname=None,
+        filename="xlsx_report.xlsx",
+        format_table=False,
+        username=None,
+        row_column_formats=None,
+        constant_memory=False,
+        width_strategy=EXACT,
+    ):
+        self.data = data
+        self.sections = sections
+        self.sheetname = sheetname
+        self.headings = headings
+        #  file name or a writable binary file-like object
+        self.filename = filename
+        self.username = username
+        self.format_table = format_table
+        self.row_column_formats = row_column_formats
+        #  flush each row to disk as soon as it is complete instead of holding
+        #  the whole sheet in memory until close(), rows must be written in order
+        self.constant_memory = constant_memory
+        #  rows measured for the column widths, widths.FIRST and widths.SAMPLE
+        #  only measure width_sample_rows of them
+        self.width_strategy = width_strategy
+        self.width_sample_rows = 1000
+
+        if not self.headings:
+            self.headings = ["XLSX Report"]
+
+        self.columns = []
+
+        self.workbook = None
+        self.formats = {}
+        #  BuildStats of the last build.  hooks are called with it when a
+        #  build is done, trace_memory records its peak allocations
+        self.stats = BuildStats("xlsx")
+        self.hooks = []
+        self.trace_memory = False
+        #  progress(rows, section, phase) is called every progress_interval
+        #  rows of a section.  cancel_token stops the build, see progress.py
+        self.progress = None
+        self.progress_interval = 1000
+        self.cancel_token = None
+        self.tracker = Progress()
+
+    def setup_sheet(self):
+        pass
+
+    def pre_build(self):
+        pass
+
+    def post_build(self):
+        pass
+
+    def build(self):
+        """
+        Returns:
+            BuildStats: where the build's time went
+        """
+        self.stats = BuildStats("xlsx", self.trace_memory)
+        self.tracker = Progress(
+            self.progress, self.progress_interval, self.cancel_token
+        )
+        state = output_state(self.filename)
+        self.stats.begin()
+        try:
+            self.tracker.update(0, None, "setup")
+            with self.stats.phase("setup"):
+                self.setup_sheet()
+
+                #  a file-like object gets the workbook without any temporary
+                #  files, unless constant_memory needs them to flush rows
+                in_memory = hasattr(self.filename, "write") and not self.constant_memory
+                self.workbook = Workbook(
+                    self.filename,
+                    {
+                        "constant_memory": self.constant_memory,
+                        "in_memory": in_memory,
+                        "remove_timezone": True,
+                    },
+                )
+                self.formats = {}
+                self.pre_build()
+
+            first, rows = peek(read_source(self.columns, self.data))
+            if first is not None:
+                self.build_section(
+                    ReportSection(
+                        header=self.sheetname,
+                        columns=self.columns,
+                        data=rows,
+                        format_table=self.format_table,
+                    )
+                )
+            else:
+                for section in self.sections:
+                    self.build_section(section)
+
+            self.post_build()
+            self.tracker.update(0, None, "close")
+
+            #  the sheets are assembled and zipped here
+            with self.stats.phase("close"):
+                self.workbook.close()
+        except BuildCancelled:
+            remove_output(self.filename, state)
+            raise
+        finally:
+            self.stats.end()
+        run_hooks(self.stats, self.hooks)
+        return self.stats
+
+    def build_section(self, section):
+        self.stats.count("sections")
+        self.stats.start("prepare")
+        section_index = self.tracker.next_section()
+        headings = [x.heading for x in section.columns]
+
+        #  data, format_table=False, sheetname="Sheet1"
+        first, rows = peek(read_source(section.columns, section.data))
+        if first is not None:
+            #  set default columns widths.  they're kept here rather than on
+            #  the Column objects, which may be shared with other reports
+            column_widths = [column.width for column in section.columns]
+            for j, column in enumerate(section.columns):
+                heading_length = len(column.heading) + 2
+                if heading_length > column_widths[j]:
+                    if column.max_width and heading_length >= column.max_width:
+                        column_widths[j] = column.max_width
+                    else:
+                        column_widths[j] = heading_length
+
+            prepared = rows if isinstance(rows, ColumnarData) else None
+            if prepared is not None:
+                #  already extracted and formatted by DataFormatter.prepare()
+                records = prepared.records(section.columns)
+            else:
+                getters = build_getters(section.columns, first)
+                records = (([getter(row) for getter in getters], None) for row in rows)
+
+            ws = self.workbook.add_worksheet(
+                name=section.header.replace("/", "-").replace(",", "")[:31]
+                if section.header
+                else "Sheet1"
+            )
+
+            if section.include_column_headers:
+                #  write header row
+                ws.write_row(
+                    row=0,
+                    col=0,
+                    data=headings,
+                )
+
+            #  the column formats are set before any rows are written, in
+            #  constant_memory mode each row picks them up as it's flushed
+            formatters = compile_columns(section.columns)
+            column_properties = [
+                self._get_column_format(column, formatters[j])
+                for j, column in enumerate(section.columns)
+            ]
+            column_formats = [self.get_format(x) for x in column_properties]
+            for j, column_format in enumerate(column_formats):
+                ws.set_column(j, j, None, column_format)
+
+            aggregator = Aggregator(section.columns, formatters)
+
+            #  tablestyle commands use reportlab coordinates, row 0 is the
+            #  heading.  the PDF table ends with a row for each scalar, so
+            #  they're counted for the negative rows to match, but the
+            #  spreadsheet's totals aren't styled
+            style_index = TableStyleIndex(
+                section.tablestyle,
+                column_count=len(section.columns),
+                row_count=len(rows) + 1 + len(aggregator.scalars)
+                if isinstance(rows, Sized)
+                else None,
+            )
+            cell_formats = {}
+            row_styles = EMPTY_STYLES
+
+            #  column widths are estimated as the cells are written and
+            #  applied with set_column once the section is complete
+            estimator = WidthEstimator(
+                [len] * len(section.columns),
+                self.width_strategy,
+                self.width_sample_rows,
+            )
+
+            stats = self.stats
+            stats.start("write")
+            records = self.tracker.rows(records, section_index, "write")
+            for i, (values, _) in enumerate(records):
+                if aggregator:
+                    aggregator.add(values)
+                if prepared is None and estimator.wants():
+                    stats.start("widths")
+                    estimator.add(self._cell_texts(section.columns, formatters, values))
+                    stats.stop()
+
+                height_rows = 1
+                if style_index:
+                    row_styles = style_index.row(i + 1)
+                for j, column in enumerate(section.columns):
+                    value = values[j]
+
+                    cell_format = None
+                    if isinstance(value, ExcelFormula):
+                        value = (
+                            value.formula.replace("?column-1", xl_col_to_name(j - 1))
+                            .replace("?column-2", xl_col_to_name(j - 2))
+                            .replace("?column+2", xl_col_to_name(j + 2))
+                            .replace("?column", xl_col_to_name(j))
+                        )
+                        #
+                        # value = (
+                        #     value.formula.replace("?column-1", xl_col_to_name(j - 1))
+                        #         .replace("?column-2", xl_col_to_name(j - 2))
+                        #         .replace("?column+2", xl_col_to_name(j + 2))
+                        #         .replace("?column", xl_col_to_name(j))
+                        # )
+                        #
+                    elif column.excel_formula:
+                        value = (
+                            column.excel_formula.replace("?row", str(i + 2))
+                            .replace("?column-1", xl_col_to_name(j - 1))
+                            .replace("?column-2", xl_col_to_name(j - 2))
+                            .replace("?column+2", xl_col_to_name(j + 2))
+                            .replace("?column", xl_col_to_name(j))
+                        )
+                    else:
+                        #  date/datetime columns are written as real excel dates
+                        coerce = formatters[j].coerce
+                        if coerce is not None:
+                            value = coerce(value)
+
+                        #  handle br in row for line breaks
+                        if isinstance(value, str):
+                            value = value.strip("\n")
+                            num_rows = len(value.split("<br />"))
+                            if num_rows > 1:
+                                value = value.replace("<br />", "\n")
+                                if num_rows > height_rows:
+                                    height_rows = num_rows
+
+                        props = row_styles.get(j)
+                        if props:
+                            cell_format = cell_formats.get((j, props))
+                            if cell_format is None:
+                                f = dict(column_properties[j])
+                                f.update(props)
+                                cell_format = self.get_format(f)
+                                cell_formats[(j, props)] = cell_format
+                        elif coerce is not None:
+                            cell_format = column_formats[j]
+                    if cell_format:
+                        ws.write(i + 1, j, value, cell_format)
+                    else:
+                        ws.write(i + 1, j, value)
+
+                if height_rows > 1:
+                    ws.set_row(i + 1, 15.001 * height_rows)
+
+            data_rows = i + 1
+            stats.stop()
+            stats.count("rows", data_rows)
+            stats.count("cells", data_rows * len(section.columns))
+
+            stats.start("scalars")
+            last_column_letter = xl_col_to_name(len(section.columns) - 1)
+            #  column number: (scalar, result) for the columns with a scalar
+            scalars = {}
+            for scalar in aggregator.scalars:
+                for j, result in aggregator.results(scalar).items():
+                    scalars[j] = (scalar, result)
+
+            if section.format_table and self.constant_memory:
+                #  tables need random access to the written cells, so in
+                #  constant_memory mode we fall back to an autofilter and a
+                #  SUBTOTAL row in the same place as the table's total row
+                ws.autofilter(0, 0, data_rows, len(section.columns) - 1)
+                for j, (scalar, result) in scalars.items():
+                    ws.write_formula(
+                        data_rows + 2,
+                        j,
+                        self._scalar_formula(scalar, j, data_rows, subtotal=True),
+                        None,
+                        self._cached_result(result),
+                    )
+            elif section.format_table:
+                columns = []
+                for j, column in enumerate(section.columns):
+                    if j in scalars:
+                        scalar, result = scalars[j]
+                        columns.append(
+                            {
+                                "header": column.heading,
+                                "total_function": TABLE_FUNCTIONS.get(scalar)
+                                or self._scalar_formula(scalar, j, data_rows),
+                                "total_value": self._cached_result(result),
+                            }
+                        )
+                    else:
+                        columns.append({"header": column.heading})
+
+                ws.add_table(
+                    "A1:%s%s" % (last_column_letter, data_rows + 3),
+                    {
+                        "style": "Table Style Medium 15",
+                        "total_row": 1,
+                        "columns": columns,
+                    },
+                )
+            else:
+                for j, (scalar, result) in scalars.items():
+                    ws.write_formula(
+                        data_rows + 2,
+                        j,
+                        self._scalar_formula(scalar, j, data_rows),
+                        None,
+                        self._cached_result(result),
+                    )
+
+            stats.stop()
+
+            if prepared is not None:
+                widths = [prepared.widths[i] for i in prepared.indexes(section.columns)]
+            else:
+                widths = estimator.widths()
+            for j, (column, width) in enumerate(zip(section.columns, widths)):
+                if width > column_widths[j]:
+                    if column.max_width and width >= column.max_width:
+                        column_widths[j] = column.max_width
+                    else:
+                        column_widths[j] = width
+
+            for j, column in enumerate(section.columns):
+                ws.set_column(
+                    j,
+                    j,
+                    column.max_width
+                    if column.max_width and column.max_width < column_widths[j]
+                    else column_widths[j] + 5,
+                    column_formats[j],
+                )
+        self.stats.stop()
+
+    def get_format(self, properties):
+        """
+        return a workbook Format for the passed properties, creating it only the
+        first time a given set of properties is seen
+
+        Args:
+            properties (dict): xlsxwriter format properties
+
+        Returns:
+            Format: shared format object for this workbook
+        """
+        key = tuple(sorted(properties.items()))
+        cell_format = self.formats.get(key)
+        if cell_format is None:
+            cell_format = self.workbook.add_format(properties)
+            self.formats[key] = cell_format
+        return cell_format
+
+    @staticmethod
+    def _scalar_formula(scalar, j, data_rows, subtotal=False):
+        """
+        formula for a column scalar over the section's data rows
+
+        Args:
+            scalar (str): one of aggregates.ACCUMULATORS
+            j (int): column number
+            data_rows (int): number of data rows, they start on row 2
+            subtotal (bool): use SUBTOTAL so filtered rows are ignored
+
+        Returns:
+            str: the formula
+        """
+        column_letter = xl_col_to_name(j)
+        cell_range = f"{column_letter}2:{column_letter}{data_rows + 1}"
+        if scalar not in SCALAR_FUNCTIONS:
+            return COUNT_DISTINCT_FORMULA.format(cell_range)
+        if subtotal:
+            return f"=SUBTOTAL({SUBTOTAL_FUNCTIONS[scalar]},{cell_range})"
+        return f"={SCALAR_FUNCTIONS[scalar]}({cell_range})"
+
+    @staticmethod
+    def _cached_result(result):
+        #  the value shown for a formula until excel recalculates it
+        if isinstance(result, Decimal):
+            return float(result)
+        if isinstance(result, (int, float)) and not isinstance(result, bool):
+            return result
+        return 0
+
+    @staticmethod
+    def _cell_texts(columns, formatters, values):
+        #  the text of each cell as it's displayed, for the width estimate
+        texts = []
+        for column, formatter, value in zip(columns, formatters, values):
+            if column.excel_formula or isinstance(value, ExcelFormula) or is_blank(value):
+                texts.append("")
+            else:
+                texts.append(
+                    formatter.prefix + formatter.format(value).strip()
+                )
+        return texts
+
+    @staticmethod
+    def _get_column_format(column, formatter):
+        f = dict(valign="top")
+
+        if formatter.num_format:
+            f["num_format"] = formatter.num_format
+
+        if column.justify == "CENTER":
+            f["align"] = "center"
+        elif column.justify == "RIGHT":
+            f["align"] = "right"
+        else:
+            f["align"] = "left"
+
+        if column.currency:
+            f["align"] = "right"
+
+        if column.wrap:
+            f["text_wrap"] = True
+
+        return f
@@ -0,0 +1,49 @@
+"""
+fixtures shared by the tests
+"""
+import pytest
+
+from pydlfmt import Column, DataFormatter
+
+
+def rows(n):
+    return [dict(id=i, name=f"name {i}", amount=i * 1.5) for i in range(n)]
+
+
+def columns():
+    return [
+        Column("id"),
+        Column("name"),
+        Column("amount", decimal_positions=2, scalar="TOTAL"),
+    ]
+
+
+def formatter(data, columns=columns):
+    df = DataFormatter(data=data)
+    df.columns = columns()
+    return df
+
+
+@pytest.fixture
+def make_rows():
+    """
+    rows(n) - n rows of id, name and amount
+    """
+    return rows
+
+
+@pytest.fixture
+def make_columns():
+    """
+    columns() - new id, name and amount (with a TOTAL) columns
+    """
+    return columns
+
+
+@pytest.fixture
+def make_formatter():
+    """
+    formatter(data, columns=columns) - a DataFormatter for the data, with the
+    columns the columns function returns
+    """
+    return formatter
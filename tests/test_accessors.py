@@ -0,0 +1,60 @@
+from collections import namedtuple
+from dataclasses import dataclass
+
+from pydlfmt import Column
+from pydlfmt.accessors import build_getters
+
+
+@dataclass
+class Customer:
+    name: str
+    city: str
+
+
+@dataclass
+class Order:
+    id: int
+    customer: Customer
+
+
+class Slotted:
+    __slots__ = ("id", "name")
+
+    def __init__(self, id, name):
+        self.id = id
+        self.name = name
+
+
+COLUMNS = [Column("id"), Column("name")]
+
+
+def values(rows, columns=COLUMNS):
+    getters = build_getters(columns, rows[0])
+    return [[getter(row) for getter in getters] for row in rows]
+
+
+def test_dict_rows():
+    assert values([{"id": 1, "name": "a"}, {"id": 2}]) == [[1, "a"], [2, ""]]
+
+
+def test_slotted_rows():
+    assert values([Slotted(1, "a"), Slotted(2, "b")]) == [[1, "a"], [2, "b"]]
+
+
+def test_namedtuple_rows():
+    Row = namedtuple("Row", ["name", "id"])
+    assert values([Row("a", 1), Row("b", 2)]) == [[1, "a"], [2, "b"]]
+
+
+def test_plain_tuple_rows_by_position():
+    assert values([(1, "a"), (2, "b")]) == [[1, "a"], [2, "b"]]
+
+
+def test_dotted_path():
+    columns = [Column("id"), Column("customer.name"), Column("customer.zip")]
+    rows = [
+        Order(1, Customer("Ann", "Madison")),
+        {"id": 2, "customer": {"name": "Bob"}},
+    ]
+    assert values(rows[:1], columns) == [[1, "Ann", ""]]
+    assert values(rows[1:], columns) == [[2, "Bob", ""]]
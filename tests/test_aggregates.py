@@ -0,0 +1,118 @@
+import datetime
+import zipfile
+from decimal import Decimal
+
+import pytest
+
+from pydlfmt import Column, DataFormatter, PDFReport, ReportSection
+from pydlfmt.aggregates import Aggregator
+from pydlfmt.formatters import compile_columns
+
+pytestmark = pytest.mark.filterwarnings("ignore:unable to load the")
+
+
+def aggregate(columns, rows):
+    aggregator = Aggregator(columns, compile_columns(columns))
+    for row in rows:
+        aggregator.add(row)
+    return aggregator
+
+
+def test_scalars():
+    columns = [
+        Column("a", decimal_positions=2, scalar="TOTAL"),
+        Column("b", scalar="avg"),
+        Column("g", scalar="SUM"),
+        Column("c", scalar="COUNT"),
+        Column("d", datatype="date", scalar="MIN"),
+        Column("e", scalar="MAX"),
+        Column("f", scalar="COUNT_DISTINCT"),
+    ]
+    rows = [
+        [1.005, 1, 1, "x", "03/02/2021", 5, "a"],
+        [2.5, 2, 2, "", "2021-01-15", 7, "b"],
+        [None, 6, 3, "y", "12/31/2021", 3, "a"],
+    ]
+    aggregator = aggregate(columns, rows)
+
+    assert aggregator.rows == 3
+    assert aggregator.scalars == ["AVG", "COUNT", "COUNT_DISTINCT", "MAX", "MIN", "TOTAL"]
+    #  values are rounded to the column's places before they're added
+    assert aggregator.results("TOTAL") == {0: Decimal("3.50"), 2: 6}
+    assert aggregator.results("AVG") == {1: 3}
+    assert aggregator.results("COUNT") == {3: 2}
+    assert aggregator.results("MIN") == {4: datetime.date(2021, 1, 15)}
+    assert aggregator.results("MAX") == {5: 7}
+    assert aggregator.results("COUNT_DISTINCT") == {6: 2}
+
+
+def test_pdf_average_excludes_heading_row():
+    columns = [Column("name"), Column("amount", scalar="AVG")]
+    pr = PDFReport()
+    aggregator = aggregate(columns, [["a", 1], ["b", 2], ["c", 6]])
+    section = ReportSection(header="x", columns=columns, data=[])
+
+    (row,) = pr._scalar_rows(section, aggregator, compile_columns(columns))
+    assert row[1] == "3.00"
+
+
+def test_xlsx_scalars_without_table(tmp_path):
+    df = DataFormatter(data=(dict(id=i, amount=i * 2) for i in range(1, 5)))
+    df.columns = [Column("id", scalar="COUNT"), Column("amount", scalar="AVG")]
+    df.to_excel(filename=str(tmp_path / "avg.xlsx"), constant_memory=True)
+
+    with zipfile.ZipFile(tmp_path / "avg.xlsx") as z:
+        sheet = z.read("xl/worksheets/sheet1.xml").decode()
+    assert "<f>COUNTA(A2:A5)</f><v>4</v>" in sheet
+    assert "<f>AVERAGE(B2:B5)</f><v>5.0</v>" in sheet
+
+
+def test_text_is_skipped_by_numeric_scalars():
+    columns = [Column("a", datatype="int", scalar="TOTAL"), Column("b", scalar="AVG")]
+    aggregator = aggregate(columns, [["NA", "NA"], ["3", 4], [2, "1,000"]])
+    assert aggregator.results("TOTAL") == {0: 5}
+    assert aggregator.results("AVG") == {1: 502}
+
+
+def test_min_max_skip_values_that_dont_compare():
+    columns = [
+        Column("a", datatype="int", scalar="MAX"),
+        Column("b", datatype="date", scalar="MIN"),
+        Column("c", scalar="MAX"),
+    ]
+    rows = [
+        ["NA", "unknown", "x"],
+        [3, "2021-03-02", 5],
+        ["12", "2020-01-15", "y"],
+        [float("nan"), "not a date", 7],
+    ]
+    aggregator = aggregate(columns, rows)
+    assert aggregator.results("MAX") == {0: 12, 2: "y"}
+    assert aggregator.results("MIN") == {1: datetime.date(2020, 1, 15)}
+
+
+def test_min_max_with_text_render(tmp_path):
+    df = DataFormatter(
+        data=[dict(n=5, when="2021-01-02"), dict(n="NA", when="n/a"), dict(n=9, when=None)]
+    )
+    df.columns = [
+        Column("n", datatype="int", scalar="MAX"),
+        Column("when", datatype="date", scalar="MIN"),
+    ]
+    df.to_excel(filename=str(tmp_path / "max.xlsx"))
+    df.to_pdf(filename=str(tmp_path / "max.pdf"))
+
+    with zipfile.ZipFile(tmp_path / "max.xlsx") as z:
+        sheet = z.read("xl/worksheets/sheet1.xml").decode()
+    assert "<f>MAX(A2:A4)</f><v>9</v>" in sheet
+
+
+def test_nan_is_skipped_by_total_and_avg():
+    columns = [
+        Column("a", decimal_positions=2, scalar="TOTAL"),
+        Column("b", scalar="AVG"),
+    ]
+    rows = [[1.5, 2], [float("nan"), "NaN"], [2.25, Decimal("NaN")], [None, 4]]
+    aggregator = aggregate(columns, rows)
+    assert aggregator.results("TOTAL") == {0: Decimal("3.75")}
+    assert aggregator.results("AVG") == {1: 3}
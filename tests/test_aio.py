@@ -0,0 +1,72 @@
+import asyncio
+import threading
+import time
+
+from pydlfmt import AsyncRenderer, Column, DataFormatter
+
+
+class SlowFormatter(DataFormatter):
+    lock = threading.Lock()
+    running = 0
+    most_running = 0
+    started = []
+
+    def to_csv(self, filename=None, **options):
+        with self.lock:
+            SlowFormatter.running += 1
+            SlowFormatter.most_running = max(self.most_running, self.running)
+            self.started.append(self.title)
+        time.sleep(0.05)
+        with self.lock:
+            SlowFormatter.running -= 1
+        return super().to_csv(filename, **options)
+
+
+def formatter(cls=DataFormatter, title=""):
+    df = cls(data=[dict(id=i) for i in range(5)])
+    df.title = title
+    df.columns = [Column("id")]
+    return df
+
+
+def test_returns_bytes():
+    renderer = AsyncRenderer(limit=2)
+
+    async def main():
+        return await asyncio.gather(
+            formatter().to_csv_async(renderer=renderer),
+            formatter().to_jsonl_async(renderer=renderer),
+        )
+
+    try:
+        csv, jsonl = asyncio.run(main())
+    finally:
+        renderer.shutdown()
+
+    assert csv.splitlines()[:2] == [b"ID", b"0"]
+    assert jsonl.splitlines()[0] == b'{"id":0}'
+
+
+def test_limit_and_cancel_before_start():
+    renderer = AsyncRenderer(limit=2)
+
+    async def main():
+        tasks = [
+            asyncio.ensure_future(
+                formatter(SlowFormatter, str(i)).to_csv_async(renderer=renderer)
+            )
+            for i in range(5)
+        ]
+        await asyncio.sleep(0.01)
+        tasks[4].cancel()
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+    try:
+        results = asyncio.run(main())
+    finally:
+        renderer.shutdown()
+
+    assert isinstance(results[4], asyncio.CancelledError)
+    assert all(isinstance(x, bytes) for x in results[:4])
+    assert SlowFormatter.most_running == 2
+    assert sorted(SlowFormatter.started) == ["0", "1", "2", "3"]
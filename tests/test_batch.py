@@ -0,0 +1,81 @@
+import os
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from pydlfmt import BatchJob, Column, DataFormatter, render_batch
+
+pytestmark = pytest.mark.filterwarnings("ignore:unable to load the")
+
+
+class TitledFormatter(DataFormatter):
+    def __init__(self, data=None, filename=None, user_id=None):
+        super().__init__(data=data, filename=filename, user_id=user_id)
+        self.title = "Customer Report"
+
+
+class CrashingFormatter(DataFormatter):
+    def to_pdf(self, *args, filename=None, **kwargs):
+        #  job 1 kills its worker, the way it dies when it's killed for its
+        #  memory.  its second amount is 1 * 1
+        if self.data[1]["amount"] == 1:
+            open(os.path.join(os.path.dirname(filename), "crashed"), "w").close()
+            os._exit(1)
+        return super().to_pdf(*args, filename=filename, **kwargs)
+
+
+def jobs(tmp_path, count):
+    for i in range(count):
+        yield BatchJob(
+            data=[dict(id=j, amount=j * i) for j in range(10)],
+            columns=[Column("id"), Column("amount", scalar="TOTAL")],
+            filename=str(tmp_path / f"customer{i}.{'xlsx' if i % 3 == 0 else 'pdf'}"),
+            format="xlsx" if i % 3 == 0 else "pdf",
+        )
+
+
+def test_render_batch(tmp_path):
+    results = list(
+        render_batch(
+            jobs(tmp_path, 9), workers=2, chunksize=2, formatter_class=TitledFormatter
+        )
+    )
+
+    assert [x.index for x in results] == list(range(9))
+    assert all(x.ok for x in results)
+    for result in results:
+        with open(result.filename, "rb") as f:
+            assert f.read(4) in [b"%PDF", b"PK\x03\x04"]
+
+
+def test_failed_jobs_are_reported(tmp_path):
+    batch = list(jobs(tmp_path, 3))
+    batch[1].options = dict(orientation=None)
+    batch[2].format = "docx"
+
+    results = list(render_batch(batch, workers=1))
+
+    assert results[0].ok
+    assert isinstance(results[1].error, AttributeError)
+    assert "Traceback" in results[1].traceback
+    assert isinstance(results[2].error, ValueError)
+
+
+def test_dead_worker_fails_only_its_job(tmp_path):
+    def batch():
+        for i, job in enumerate(jobs(tmp_path, 12)):
+            if i == 4:
+                #  the pool is broken before the later chunks are submitted
+                while not (tmp_path / "crashed").exists():
+                    time.sleep(0.01)
+                time.sleep(0.5)
+            yield job
+
+    results = list(
+        render_batch(batch(), workers=2, chunksize=2, formatter_class=CrashingFormatter)
+    )
+
+    assert [x.index for x in results] == list(range(12))
+    assert [x.index for x in results if not x.ok] == [1]
+    assert isinstance(results[1].error, BrokenProcessPool)
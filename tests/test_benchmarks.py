@@ -0,0 +1,78 @@
+import pytest
+
+from benchmarks import compare, run
+from benchmarks.data import FIELDS, generate
+from pydlfmt.formatters import compile_columns
+
+pytestmark = pytest.mark.filterwarnings("ignore:unable to load the")
+
+
+@pytest.mark.parametrize("shape", ["dict", "dataclass", "slotted"])
+def test_generate(shape):
+    def values(row):
+        return row if shape == "dict" else {x: getattr(row, x) for x in FIELDS}
+
+    rows = [values(x) for x in generate(5, shape)]
+
+    #  the same seed gives the same data
+    assert rows == [values(x) for x in generate(5, shape)]
+    assert sorted(rows[0]) == sorted(FIELDS)
+    assert [x["id"] for x in rows] == [1, 2, 3, 4, 5]
+
+
+def test_measure(monkeypatch):
+    monkeypatch.setitem(run.SIZES, "small", 30)
+    for scenario in run.scenarios(sizes=["small"], shapes=["slotted"], variants=["all"]):
+        result = run.measure(scenario)
+
+        assert result["name"] == scenario.name
+        assert result["rows"] == 30
+        assert result["seconds"] > 0
+        assert result["traced_peak_mb"] > 0
+        assert result["output_bytes"] > 0
+
+
+def test_sections_and_tablestyle():
+    scenario = run.Scenario("pdf", "small", "dict", "all")
+    data = generate(50)
+    df = run.build_formatter(scenario, data)
+
+    assert sum(len(x.data) for x in df.sections) == 50
+    assert [x.header for x in df.sections] == sorted(x.header for x in df.sections)
+    assert any(x.tablestyle for x in df.sections)
+
+
+def result(name, seconds, rss=50.0):
+    return dict(name=name, seconds=seconds, peak_rss_mb=rss, traced_peak_mb=None)
+
+
+def test_compare():
+    old = dict(results=[result("a", 1.0), result("b", 1.0), result("c", 1.0)])
+    new = dict(results=[result("a", 1.5), result("b", 0.5), result("c", 1.02, rss=80.0)])
+
+    statuses = {
+        (x["name"], x["metric"]): x["status"] for x in compare.compare(old, new)
+    }
+    assert statuses == {
+        ("a", "seconds"): "regression",
+        ("a", "peak_rss_mb"): "ok",
+        ("b", "seconds"): "improvement",
+        ("b", "peak_rss_mb"): "ok",
+        ("c", "seconds"): "ok",
+        ("c", "peak_rss_mb"): "regression",
+    }
+
+
+def test_date_strings_are_parsed():
+    scenario = run.Scenario("xlsx", "small", "dict", "datestrings")
+    data = generate(4)
+    df = run.build_formatter(scenario, data)
+
+    assert df.columns[-1].name == "born"
+    #  ISO and month first strings in turn, read as the same kind of date
+    assert ["/" in x["born"] for x in data] == [False, True, False, True]
+    born = compile_columns(df.columns)[-1]
+    for row in data:
+        date = born.coerce(row["born"])
+        assert born.format(date) == date.strftime("%m/%d/%Y")
+        assert date.isoformat() == row["born"] or date.strftime("%m/%d/%Y") == row["born"]
@@ -0,0 +1,65 @@
+import datetime
+import zipfile
+
+import pytest
+
+from pydlfmt import Column, ExcelFormula
+from pydlfmt.columnar import ColumnarData
+
+
+def columns():
+    return [
+        Column("id"),
+        Column("amount", decimal_positions=2, include_commas=True, scalar="TOTAL"),
+        Column("when", datatype="date"),
+        Column("double", excel_formula="=?column-2?row*2"),
+    ]
+
+
+def rows():
+    return [
+        dict(id=i, amount=i * 1234.5, when=f"2021-03-{i + 1:02}") for i in range(20)
+    ] + [dict(id=20, amount=None, when="", double=ExcelFormula("=1"))]
+
+
+def test_prepared_values_and_texts():
+    data = ColumnarData(columns(), iter(rows()))
+
+    assert len(data) == 21
+    assert data[1][:3] == (1, 1234.5, datetime.date(2021, 3, 2))
+    assert data.texts[1][1] == "1,234.50"
+    assert data.texts[2][1] == "03/02/2021"
+    assert data.texts[3][20] == ""
+    assert data.widths == [2, 9, 10, 0]
+    assert data[-2:] == [data[19], data[20]]
+
+    with pytest.raises(ValueError):
+        data.indexes([Column("id")])
+
+
+def read_sheet(filename):
+    with zipfile.ZipFile(filename) as z:
+        return z.read("xl/worksheets/sheet1.xml").decode()
+
+
+def test_prepared_renders_the_same(tmp_path, make_formatter):
+    plain = make_formatter(rows(), columns)
+    plain.to_excel(filename=str(tmp_path / "plain.xlsx"))
+
+    prepared = make_formatter(rows(), columns)
+    prepared.prepare()
+    prepared.to_excel(filename=str(tmp_path / "prepared.xlsx"))
+
+    assert read_sheet(tmp_path / "plain.xlsx") == read_sheet(tmp_path / "prepared.xlsx")
+    assert [x.width for x in plain.columns] == [x.width for x in prepared.columns]
+
+
+@pytest.mark.filterwarnings("ignore:unable to load the")
+def test_prepared_pdf(tmp_path, make_formatter):
+    df = make_formatter((row for row in rows()), columns)
+    df.prepare()
+    df.to_pdf(filename=str(tmp_path / "prepared.pdf"))
+    df.to_excel(filename=str(tmp_path / "prepared.xlsx"))
+
+    assert (tmp_path / "prepared.pdf").stat().st_size > 0
+    assert "SUM(B2:B22)" in read_sheet(tmp_path / "prepared.xlsx")
@@ -0,0 +1,50 @@
+import datetime
+import zipfile
+
+from pydlfmt import Column, DataFormatter
+from pydlfmt.dates import DateCoercer
+
+
+def test_iso_and_inferred_formats():
+    coerce = DateCoercer("date")
+    assert coerce("2021-03-02") == datetime.date(2021, 3, 2)
+    assert coerce("2021-03-02T10:30:00") == datetime.date(2021, 3, 2)
+
+    assert coerce("03/04/2021") == datetime.date(2021, 3, 4)
+    assert coerce.format == "%m/%d/%Y"
+    assert coerce("12/31/2020") == datetime.date(2020, 12, 31)
+
+    #  neither iso nor one of DATE_FORMATS, left to dateutil
+    assert coerce("4th of July 2021") == datetime.date(2021, 7, 4)
+
+
+def test_datetime_column():
+    coerce = DateCoercer("datetime")
+    assert coerce("03/04/2021 01:15PM") == datetime.datetime(2021, 3, 4, 13, 15)
+    assert coerce(datetime.date(2021, 3, 4)) == datetime.datetime(2021, 3, 4)
+
+
+def test_values_are_memoized_and_bad_values_pass_through():
+    coerce = DateCoercer("date", cache_size=2)
+    assert coerce("not a date") == "not a date"
+    assert coerce(None) is None
+    assert coerce("") == ""
+
+    coerce("2021-01-01")
+    assert "2021-01-01" in coerce.cache
+    coerce("2021-01-02")
+    assert len(coerce.cache) <= 2
+
+
+def test_xlsx_writes_real_dates(tmp_path):
+    df = DataFormatter(data=[dict(id=1, when="2021-03-02"), dict(id=2, when="03/04/2021")])
+    df.columns = [Column("id"), Column("when", datatype="date")]
+    df.to_excel(filename=str(tmp_path / "dates.xlsx"), constant_memory=True)
+
+    with zipfile.ZipFile(tmp_path / "dates.xlsx") as z:
+        sheet = z.read("xl/worksheets/sheet1.xml").decode()
+        styles = z.read("xl/styles.xml").decode()
+    #  excel serial dates, formatted with the column's date format
+    assert '<c r="B2" s="2"><v>44257</v></c>' in sheet
+    assert '<c r="B3" s="2"><v>44259</v></c>' in sheet
+    assert 'formatCode="mm/dd/yyyy"' in styles
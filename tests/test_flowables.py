@@ -0,0 +1,94 @@
+import io
+
+from reportlab.lib import colors
+from reportlab.platypus import SimpleDocTemplate
+
+from pydlfmt.flowables import LazyTable
+
+
+def test_lazy_table_pulls_rows_as_pages_are_laid_out():
+    pulled = []
+
+    def rows():
+        for i in range(500):
+            pulled.append(i)
+            yield [str(i), f"name {i}"]
+
+    table = LazyTable(
+        [["ID", "NAME"]],
+        rows(),
+        [100, 200],
+        [
+            ("GRID", (0, 0), (-1, -1), 0.25, colors.gray),
+            ("BACKGROUND", (0, -1), (-1, -1), colors.yellow),
+        ],
+        tail=lambda: [["TOTAL", str(len(pulled))]],
+        chunk_rows=50,
+    )
+
+    pages = []
+
+    def on_page(canvas, doc):
+        pages.append(len(pulled))
+
+    doc = SimpleDocTemplate(io.BytesIO())
+    doc.build([table], onFirstPage=on_page, onLaterPages=on_page)
+
+    assert pulled == list(range(500))
+    assert len(pages) > 5
+    #  rows are pulled a page or so ahead of the page being drawn, never all up front
+    assert pages[0] < 150
+    assert table.offset + len(table.pending) <= 501
+
+
+def test_chunk_style_translates_rows():
+    table = LazyTable(
+        [["ID"]],
+        iter([[str(i)] for i in range(10)]),
+        [100],
+        [
+            ("BACKGROUND", (0, 0), (-1, 0), colors.pink),
+            ("BACKGROUND", (0, 3), (0, 4), colors.red),
+            ("BACKGROUND", (0, 7), (0, -1), colors.blue),
+            ("BACKGROUND", (0, -1), (-1, -1), colors.yellow),
+        ],
+        chunk_rows=5,
+    )
+    #  rows 0 and 1 were drawn on the first page, 2-4 are waiting for this one
+    table._fill(5)
+    table.pending = table.pending[2:]
+    table.offset = 2
+
+    assert table._chunk_style() == [
+        ("BACKGROUND", (0, 0), (-1, 0), colors.pink),
+        ("BACKGROUND", (0, 1), (0, 2), colors.red),
+    ]
+
+
+def striped_table(count):
+    style = [("GRID", (0, 0), (-1, -1), 0.25, colors.gray)]
+    for i in range(1, count + 1, 2):
+        style.append(("BACKGROUND", (0, i), (-1, i), colors.lightgrey))
+    style.append(("BACKGROUND", (0, 500), (-1, 1000), colors.blue))
+    style.append(("BACKGROUND", (0, -1), (-1, -1), colors.yellow))
+    table = LazyTable(
+        [["ID"]], iter([[str(i)] for i in range(count)]), [100], style, chunk_rows=50
+    )
+    table._fill(count)
+    return table
+
+
+def test_chunk_style_looks_up_its_rows():
+    small, large = striped_table(2_000), striped_table(40_000)
+    for table in [small, large]:
+        table.offset = 1_000
+        table.pending = table.pending[1_000:1_050]
+    #  only the stripes on the chunk's 50 rows are gone through, not all of them
+    assert len(large._chunk_commands()) == len(small._chunk_commands()) < 40
+
+    #  same commands as scanning the whole list
+    chunk_style = large._chunk_style()
+    large.general = list(enumerate(large.style))
+    large.ranged, large.range_starts = [], []
+    assert large._chunk_style() == chunk_style
+    assert ("BACKGROUND", (0, 1), (-1, 1), colors.lightgrey) in chunk_style
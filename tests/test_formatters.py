@@ -0,0 +1,52 @@
+import datetime
+from decimal import Decimal
+
+from pydlfmt import Column
+from pydlfmt.formatters import ColumnFormatter
+
+
+def test_numbers_round_half_up():
+    formatter = ColumnFormatter(Column("x", decimal_positions=2))
+    assert formatter.format(1.5) == "1.50"
+    assert formatter.format(3) == "3.00"
+    #  exact binary ties go through Decimal, format() alone rounds half even
+    assert formatter.format(0.125) == "0.13"
+    assert formatter.format(-0.125) == "-0.13"
+    assert formatter.format(1.005) == "1.00"
+    assert formatter.format("2.345") == "2.35"
+    assert formatter.format(Decimal("2.345")) == "2.35"
+
+    formatter = ColumnFormatter(Column("x", datatype="int", include_commas=True))
+    assert formatter.format(2.5) == "3"
+    assert formatter.format(1234567) == "1,234,567"
+    assert formatter.format("NA") == "NA"
+
+
+def test_float_fast_path_matches_decimal():
+    formatter = ColumnFormatter(Column("x", decimal_positions=3, include_commas=True))
+    for i in range(-5000, 5000):
+        value = i / 64
+        expected = "{0:,.3f}".format(formatter.round(value))
+        assert formatter.format(value) == expected
+
+
+def test_dates_and_currency():
+    formatter = ColumnFormatter(Column("x", datatype="datetime"))
+    assert formatter.format("2021-03-02 13:05") == "03/02/2021 01:05PM"
+    assert formatter.format(datetime.date(2021, 3, 2)) == "03/02/2021 12:00AM"
+    assert formatter.num_format == "mm/dd/yyyy HH:MM AM/PM"
+
+    formatter = ColumnFormatter(Column("x", currency=True))
+    assert formatter.prefix == "$"
+    assert formatter.format(12.5) == "12.5"
+    assert formatter.num_format == "$ #,##0.00"
+
+
+def test_large_ints_are_exact():
+    formatter = ColumnFormatter(Column("id", datatype="int"))
+    assert formatter.format(1234567890123456789) == "1234567890123456789"
+    assert formatter.number(-(2**63)) == str(-(2**63))
+
+    formatter = ColumnFormatter(Column("x", decimal_positions=2))
+    assert formatter.format(10**17 + 1) == "100000000000000001.00"
+    assert formatter.number(10**17 + 1) == "100000000000000001.00"
@@ -0,0 +1,37 @@
+import subprocess
+import sys
+
+HEAVY_MODULES = ("reportlab", "xlsxwriter", "dateutil")
+
+
+def loaded_modules(code):
+    script = (
+        f"{code}\n"
+        "import sys\n"
+        f"print(sorted({{m.split('.')[0] for m in sys.modules}} & set({HEAVY_MODULES!r})))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, text=True, check=True
+    )
+    return result.stdout.strip()
+
+
+def test_import_doesnt_load_renderers():
+    assert (
+        loaded_modules("from pydlfmt import Column, DataFormatter, ReportSection")
+        == "[]"
+    )
+
+
+def test_to_excel_doesnt_load_reportlab(tmp_path):
+    code = (
+        "from pydlfmt import Column, DataFormatter\n"
+        "df = DataFormatter(data=[dict(a=1)])\n"
+        "df.columns = [Column('a')]\n"
+        f"df.to_excel(filename={str(tmp_path / 'a.xlsx')!r})"
+    )
+    assert loaded_modules(code) == "['xlsxwriter']"
+
+
+def test_renderers_still_importable():
+    from pydlfmt import PDFReport, TableStyle, XLSXReport  # noqa: F401
@@ -0,0 +1,64 @@
+import multiprocessing
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from pydlfmt.parallel import WorkerTraceback, get_context
+
+pytestmark = pytest.mark.filterwarnings("ignore:unable to load the")
+
+
+@pytest.mark.parametrize("parallel", [True, False])
+def test_render(tmp_path, parallel, make_rows, make_formatter):
+    #  a generator, render reads it once for both formats
+    df = make_formatter(iter(make_rows(30)))
+    files = df.render(
+        filename=str(tmp_path / "both.pdf"),
+        parallel=parallel,
+        xlsx=dict(format_table=True),
+    )
+
+    assert files == dict(pdf=str(tmp_path / "both.pdf"), xlsx=str(tmp_path / "both.xlsx"))
+    assert (tmp_path / "both.pdf").read_bytes().startswith(b"%PDF")
+    with zipfile.ZipFile(tmp_path / "both.xlsx") as z:
+        assert "xl/tables/table1.xml" in z.namelist()
+
+
+def test_worker_errors_are_raised(tmp_path, make_rows, make_formatter):
+    df = make_formatter(make_rows(1))
+    with pytest.raises(TypeError) as e:
+        df.render(filename=str(tmp_path / "bad"), xlsx=dict(no_such_option=True))
+    assert isinstance(e.value.__cause__, WorkerTraceback)
+    assert "no_such_option" in str(e.value.__cause__)
+    #  the other format is still rendered
+    assert (tmp_path / "bad.pdf").exists()
+
+
+def test_unknown_format(make_formatter):
+    with pytest.raises(ValueError):
+        make_formatter([]).render(formats=["docx"])
+
+
+@pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(), reason="can't fork"
+)
+def test_no_fork_while_threads_run(tmp_path, make_rows, make_formatter):
+    assert get_context().get_start_method() == "fork"
+
+    stop = threading.Event()
+    thread = threading.Thread(target=stop.wait)
+    thread.start()
+    try:
+        assert get_context().get_start_method() != "fork"
+    finally:
+        stop.set()
+        thread.join()
+
+    #  a render from a thread pool pickles the formatter to its workers
+    df = make_formatter(make_rows(30))
+    with ThreadPoolExecutor(1) as pool:
+        files = pool.submit(df.render, filename=str(tmp_path / "threaded.pdf")).result()
+    assert (tmp_path / "threaded.pdf").read_bytes().startswith(b"%PDF")
+    assert files["xlsx"] == str(tmp_path / "threaded.xlsx")
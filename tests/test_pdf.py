@@ -0,0 +1,109 @@
+import io
+import warnings
+
+import pytest
+
+from pydlfmt import Column, DataFormatter, PDFReport
+from pydlfmt.resources import FALLBACK_FONTS, get_stylesheet, register_fonts
+
+pytestmark = pytest.mark.filterwarnings("ignore:unable to load the")
+
+
+def test_missing_fonts_fall_back_to_helvetica():
+    font_files = dict(
+        normal="missing.ttf",
+        bold="missing-bold.ttf",
+        italic="missing-italic.ttf",
+        bold_italic="missing-bold-italic.ttf",
+    )
+    with pytest.warns(UserWarning):
+        font_names = register_fonts("Missing", font_files)
+    assert font_names == FALLBACK_FONTS
+
+    #  only the first call does any work
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        assert register_fonts("Missing", font_files) is font_names
+
+
+def test_stylesheet_copies_are_independent():
+    first = get_stylesheet()
+    second = get_stylesheet()
+    first["Normal"].fontSize = 20
+    assert second["Normal"].fontSize == 10
+    assert first["BodyText"] is not second["BodyText"]
+
+
+def test_reports_get_their_own_styles():
+    first = PDFReport()
+    second = PDFReport()
+    first.styleN.fontSize = 20
+    assert second.styleN.fontSize == 10
+    assert first.DEFAULT_TABLE_STYLE is not second.DEFAULT_TABLE_STYLE
+
+
+def test_build_pdf(tmp_path):
+    df = DataFormatter(data=(dict(id=i, amount=i * 1.5) for i in range(200)))
+    df.columns = [Column("id"), Column("amount", decimal_positions=2, scalar="TOTAL")]
+    df.to_pdf(filename=str(tmp_path / "report.pdf"))
+
+    with open(tmp_path / "report.pdf", "rb") as f:
+        assert f.read(5) == b"%PDF-"
+
+
+def test_pdf_in_memory(tmp_path):
+    df = DataFormatter(data=[dict(id=i) for i in range(10)])
+    df.columns = [Column("id")]
+
+    pdf = df.to_pdf()
+    assert pdf.startswith(b"%PDF")
+
+    output = io.BytesIO()
+    assert df.to_pdf(filename=output) is None
+    assert output.getvalue().startswith(b"%PDF")
+
+    df.filename = str(tmp_path / "report.xlsx")
+    df.to_pdf()
+    assert (tmp_path / "report.pdf").exists()
+
+
+def test_cell_fit_measures_every_text():
+    from pydlfmt.pdf import CELL_PADDING, CellFit
+    from pydlfmt.resources import FontMetrics
+
+    metrics = FontMetrics("Helvetica", 8)
+    cell_fit = CellFit([Column("x")], [metrics], [None])
+    cell_fit.set_widths([metrics("i" * 40) + CELL_PADDING])
+
+    assert cell_fit.fits(0, "i" * 40)
+    #  fewer characters, but much wider
+    assert not cell_fit.fits(0, "W" * 30)
+    assert cell_fit.fits(0, "W" * 5)
+
+
+def test_plain_and_paragraph_cells():
+    from reportlab.platypus import Paragraph
+
+    from pydlfmt import ReportSection
+    from pydlfmt.flowables import LazyTable
+
+    pr = PDFReport()
+    pr.setup_document()
+    columns = [Column("id"), Column("name", bold=True, max_width=10)]
+    data = [
+        dict(id=1, name="short"),
+        dict(id=2, name="a much longer name " * 10),
+        dict(id=3, name="a<br />b"),
+    ]
+    pr.build_section(ReportSection(header="", columns=columns, data=data))
+    table = next(x for x in pr.report_story if isinstance(x, LazyTable))
+    rows = list(table.rows)
+
+    #  simple cells are drawn by the table as plain strings
+    assert rows[0] == ["1", "short"]
+    assert [x[0] for x in rows] == ["1", "2", "3"]
+    #  too wide or markup, these need a Paragraph in the column's font
+    for cell in [rows[1][1], rows[2][1]]:
+        assert isinstance(cell, Paragraph)
+        assert cell.style.fontName == pr.bold_font
+    assert ("FONTNAME", (1, 1), (1, -1), pr.bold_font) in table.style
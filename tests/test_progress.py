@@ -0,0 +1,110 @@
+import asyncio
+import threading
+
+import pytest
+
+from pydlfmt import BuildCancelled, CancelToken, Column, ReportSection
+from pydlfmt.aio import AsyncRenderer
+
+pytestmark = pytest.mark.filterwarnings("ignore:unable to load the")
+
+
+@pytest.mark.parametrize(
+    "method, phase",
+    [("to_pdf", "format"), ("to_excel", "write"), ("to_csv", "write")],
+)
+def test_progress(method, phase, make_rows, make_formatter):
+    calls = []
+    df = make_formatter(None)
+    df.columns = [Column("id")]
+    df.sections = [
+        ReportSection(header="a", columns=df.columns, data=make_rows(250)),
+        ReportSection(header="b", columns=df.columns, data=make_rows(100)),
+    ]
+    df.progress = lambda *args: calls.append(args)
+    df.progress_interval = 100
+    getattr(df, method)()
+
+    assert [x for x in calls if x[1] is not None] == [
+        (100, 0, phase),
+        (200, 0, phase),
+        (250, 0, phase),
+        (100, 1, phase),
+    ]
+    assert calls[0] == (0, None, "setup")
+
+
+@pytest.mark.parametrize("method", ["to_pdf", "to_excel", "to_csv", "to_jsonl"])
+def test_cancel_removes_output(tmp_path, method, make_rows, make_formatter):
+    token = CancelToken()
+
+    def progress(rows, section, phase):
+        if rows >= 200:
+            token.cancel()
+
+    df = make_formatter(make_rows(1000))
+    df.progress = progress
+    df.progress_interval = 100
+    df.cancel_token = token
+    filename = tmp_path / "report.out"
+    with pytest.raises(BuildCancelled):
+        getattr(df, method)(filename=str(filename))
+    assert not filename.exists()
+
+
+def test_cancelled_before_build_keeps_file(tmp_path, make_rows, make_formatter):
+    filename = tmp_path / "report.csv"
+    filename.write_text("last week's report")
+    token = CancelToken()
+    token.cancel()
+
+    df = make_formatter(make_rows(10))
+    df.cancel_token = token
+    with pytest.raises(BuildCancelled):
+        df.to_pdf(filename=str(filename))
+    #  the build never got to the file
+    assert filename.read_text() == "last week's report"
+
+
+def test_cancel_async(make_rows, make_formatter):
+    started = threading.Event()
+
+    def progress(rows, section, phase):
+        started.set()
+
+    df = make_formatter(make_rows(30_000))
+    df.progress = progress
+    df.progress_interval = 100
+    df.cancel_token = CancelToken()
+
+    async def main():
+        renderer = AsyncRenderer(limit=2)
+        cancelled = asyncio.ensure_future(df.to_csv_async(renderer=renderer))
+        while not started.is_set():
+            await asyncio.sleep(0.01)
+        other = asyncio.ensure_future(df.to_csv_async(renderer=renderer))
+        cancelled.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+        try:
+            return await other
+        finally:
+            renderer.shutdown()
+
+    #  only the cancelled call stops, the formatter's other builds carry on
+    output = asyncio.run(main())
+    assert len(output.splitlines()) == 30_001
+    assert not df.cancel_token.cancelled
+    assert df.to_csv()
+
+
+def test_linked_tokens():
+    parent = CancelToken()
+    child = CancelToken(parent=parent)
+    child.cancel()
+    assert child.cancelled and not parent.cancelled
+
+    child = CancelToken(parent=parent)
+    parent.cancel()
+    with pytest.raises(BuildCancelled):
+        child.check()
@@ -0,0 +1,103 @@
+import datetime
+import subprocess
+import sys
+
+import pytest
+
+from pydlfmt import Column
+from pydlfmt.columnar import ColumnarData
+
+numpy = pytest.importorskip("numpy")
+
+
+def columns():
+    return [
+        Column("name"),
+        Column("amount", decimal_positions=2, include_commas=True, currency=True),
+        Column("qty", datatype="int", scalar="TOTAL"),
+        Column("when", datatype="date"),
+        Column("at", datatype="datetime"),
+        Column("missing"),
+    ]
+
+
+def rows():
+    return [
+        dict(
+            name="a",
+            amount=0.125,
+            qty=3,
+            when=datetime.datetime(2024, 1, 2),
+            at=datetime.datetime(2024, 1, 2, 13, 5),
+        ),
+        dict(
+            name="b",
+            amount=1234567.5,
+            qty=0,
+            when=datetime.datetime(2023, 5, 6),
+            at=datetime.datetime(2023, 5, 6, 1, 2),
+        ),
+        dict(name=None, amount=None, qty=7, when=None, at=None),
+    ]
+
+
+def check_source(data):
+    expected = ColumnarData(columns(), rows())
+    prepared = ColumnarData(columns(), data)
+
+    assert prepared.values == expected.values
+    assert prepared.texts == expected.texts
+    assert prepared.widths == expected.widths
+    assert prepared.texts[1] == ["$0.13", "$1,234,567.50", ""]
+    assert prepared.texts[3] == ["01/02/2024", "05/06/2023", ""]
+
+
+def test_dataframe():
+    pandas = pytest.importorskip("pandas")
+    check_source(pandas.DataFrame(rows()))
+
+
+def test_structured_array():
+    pandas = pytest.importorskip("pandas")
+    check_source(pandas.DataFrame(rows()).to_records(index=False))
+
+
+def test_arrow_table():
+    pyarrow = pytest.importorskip("pyarrow")
+    check_source(pyarrow.Table.from_pylist(rows()))
+
+
+def test_64_bit_ints():
+    pandas = pytest.importorskip("pandas")
+    ids = [1234567890123456789, -(2**63), 7]
+    data = pandas.DataFrame(dict(id=ids, amount=[10**17 + 1, 0, 5]))
+    prepared = ColumnarData(
+        [Column("id", datatype="int"), Column("amount", decimal_positions=2)], data
+    )
+    assert prepared.texts[0] == [str(x) for x in ids]
+    assert prepared.texts[1] == ["100000000000000001.00", "", "5.00"]
+
+
+def test_dataframe_renders(tmp_path, make_formatter):
+    pandas = pytest.importorskip("pandas")
+    df = make_formatter(pandas.DataFrame(rows()), columns)
+    df.to_excel(filename=str(tmp_path / "frame.xlsx"))
+    df.to_pdf(filename=str(tmp_path / "frame.pdf"))
+
+    assert (tmp_path / "frame.xlsx").stat().st_size
+    assert (tmp_path / "frame.pdf").stat().st_size
+
+
+def test_plain_data_doesnt_load_numpy(tmp_path):
+    script = (
+        "from pydlfmt import Column, DataFormatter\n"
+        "df = DataFormatter(data=[dict(a=1)])\n"
+        "df.columns = [Column('a')]\n"
+        f"df.prepare().to_excel(filename={str(tmp_path / 'a.xlsx')!r})\n"
+        "import sys\n"
+        "print(sorted({'numpy', 'pandas', 'pyarrow'} & set(sys.modules)))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "[]"
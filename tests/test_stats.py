@@ -0,0 +1,111 @@
+import pytest
+
+from pydlfmt import Column, DataFormatter, add_hook, remove_hook
+from pydlfmt.stats import BuildStats
+
+pytestmark = pytest.mark.filterwarnings("ignore:unable to load the")
+
+
+def formatter():
+    df = DataFormatter(
+        data=[
+            dict(id=i, name=f"name {i}", amount=i * 1.5, when="2021-03-04")
+            for i in range(200)
+        ]
+    )
+    df.columns = [
+        Column("id"),
+        Column("name", wrap=True),
+        Column("amount", decimal_positions=2, scalar="TOTAL"),
+        Column("when", datatype="date"),
+    ]
+    return df
+
+
+def test_pdf_stats():
+    df = formatter()
+    df.to_pdf()
+
+    stats = df.stats
+    assert stats.format == "pdf"
+    assert {"setup", "widths", "format", "paragraphs", "layout"} <= set(stats.phases)
+    assert stats.counts["rows"] == 200
+    assert stats.counts["cells"] == 800
+    assert stats.counts["sections"] == 1
+    assert stats.counts["pages"] >= 1
+    #  the phases don't overlap
+    assert sum(stats.phases.values()) <= stats.seconds
+
+
+def test_xlsx_stats():
+    df = formatter()
+    df.to_excel()
+
+    stats = df.stats
+    assert stats.format == "xlsx"
+    assert {"setup", "write", "widths", "close"} <= set(stats.phases)
+    assert stats.counts["rows"] == 200
+    assert stats.counts["cells"] == 800
+    assert stats.peak_allocated is None
+
+
+def test_hooks():
+    seen = []
+    df = formatter()
+    df.hooks.append(lambda stats: seen.append(("report", stats.format)))
+    hook = lambda stats: seen.append(("process", stats.format))  # noqa: E731
+    add_hook(hook)
+    try:
+        df.to_csv()
+        df.to_jsonl()
+    finally:
+        remove_hook(hook)
+    df.to_csv()
+
+    assert seen == [
+        ("report", "csv"),
+        ("process", "csv"),
+        ("report", "jsonl"),
+        ("process", "jsonl"),
+        ("report", "csv"),
+    ]
+    assert df.stats.counts["rows"] == 200
+
+
+def test_trace_memory():
+    import tracemalloc
+
+    df = formatter()
+    df.trace_memory = True
+    df.to_excel()
+    assert df.stats.peak_allocated > 0
+    assert not tracemalloc.is_tracing()
+
+
+def test_overlapping_builds_record_no_peak():
+    import tracemalloc
+
+    first = BuildStats("pdf", trace_memory=True)
+    second = BuildStats("xlsx", trace_memory=True)
+    first.begin()
+    second.begin()
+    second.end()
+    #  the first build is still running
+    assert tracemalloc.is_tracing()
+    first.end()
+
+    assert first.peak_allocated is None
+    assert second.peak_allocated is None
+    assert not tracemalloc.is_tracing()
+
+
+def test_nested_phases():
+    stats = BuildStats("pdf")
+    stats.begin()
+    with stats.phase("layout"):
+        for _ in stats.timed("format", range(3)):
+            stats.count("rows")
+    stats.end()
+    assert set(stats.phases) == {"layout", "format"}
+    assert stats.counts == dict(rows=3)
+    assert stats.phases["layout"] + stats.phases["format"] <= stats.seconds
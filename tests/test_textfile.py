@@ -0,0 +1,116 @@
+import csv
+import io
+import json
+import tempfile
+
+import pytest
+
+from pydlfmt import Column, DataFormatter, ExcelFormula, ReportSection
+
+
+def columns():
+    return [
+        Column("id"),
+        Column("name", heading="Full Name"),
+        Column("amount", decimal_positions=2, currency=True, include_commas=True),
+        Column("when", datatype="date"),
+        Column("qty", datatype="int"),
+        Column("double", excel_formula="=?column-1?row*2"),
+    ]
+
+
+def rows():
+    return [
+        dict(id=1, name="a<br />b", amount=1234.125, when="2021-03-04", qty=0),
+        dict(id=2, name=None, amount=None, when=None, qty=3.0, double=ExcelFormula("=1")),
+    ]
+
+
+def test_csv(tmp_path, make_formatter):
+    make_formatter(iter(rows()), columns).to_csv(tmp_path / "out.csv")
+
+    with open(tmp_path / "out.csv", newline="") as f:
+        assert list(csv.reader(f)) == [
+            ["ID", "FULL NAME", "AMOUNT", "WHEN", "QTY", "DOUBLE"],
+            ["1", "a\nb", "$1,234.13", "03/04/2021", "0", ""],
+            ["2", "", "", "", "3", ""],
+        ]
+
+
+def test_jsonl(make_formatter):
+    output = io.BytesIO()
+    make_formatter(rows(), columns).prepare().to_jsonl(output)
+
+    lines = [json.loads(x) for x in output.getvalue().decode().splitlines()]
+    assert lines == [
+        dict(id=1, name="a\nb", amount=1234.13, when="03/04/2021", qty=0, double=None),
+        dict(id=2, name=None, amount=None, when=None, qty=3, double=None),
+    ]
+
+
+def test_jsonl_display_strings(make_formatter):
+    output = io.StringIO()
+    make_formatter(rows(), columns).to_jsonl(output, typed=False)
+
+    first = json.loads(output.getvalue().splitlines()[0])
+    assert first["amount"] == "$1,234.13"
+    assert first["qty"] == "0"
+
+
+def test_csv_sections():
+    df = DataFormatter()
+    df.sections = [
+        ReportSection(header=x, columns=[Column("id")], data=[dict(id=x)])
+        for x in ["a", "b"]
+    ]
+    output = io.StringIO()
+    df.to_csv(output)
+
+    assert output.getvalue().splitlines() == ["ID", "a", "ID", "b"]
+
+
+def test_64_bit_ids():
+    df = DataFormatter(data=[dict(id=1234567890123456789, amount=10**17 + 1)])
+    df.columns = [Column("id", datatype="int"), Column("amount", decimal_positions=2)]
+
+    assert df.to_csv().decode().splitlines()[1] == (
+        "1234567890123456789,100000000000000001.00"
+    )
+    assert df.to_jsonl().decode() == (
+        '{"id":1234567890123456789,"amount":100000000000000001.00}\n'
+    )
+
+
+@pytest.mark.parametrize(
+    "temporary_file", [tempfile.NamedTemporaryFile, tempfile.SpooledTemporaryFile]
+)
+@pytest.mark.parametrize("mode", ["w+b", "w+"])
+def test_temporary_files(temporary_file, mode, make_formatter):
+    with temporary_file(mode=mode) as output:
+        make_formatter(rows(), columns).to_csv(output)
+        make_formatter(rows(), columns).to_jsonl(output)
+        output.seek(0)
+        text = output.read()
+
+    if "b" in mode:
+        text = text.decode()
+    assert text.startswith("ID,FULL NAME,AMOUNT")
+    assert text.endswith('"qty":3,"double":null}\n')
+
+
+class ByteSink:
+    #  a binary stream with none of the io interface but write()
+    mode = "wb"
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        assert isinstance(data, bytes)
+        self.chunks.append(data)
+
+
+def test_bare_binary_stream(make_formatter):
+    output = ByteSink()
+    make_formatter(rows(), columns).to_csv(output, encoding="utf-16")
+    assert b"".join(output.chunks).decode("utf-16").startswith("ID,FULL NAME")
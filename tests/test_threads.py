@@ -0,0 +1,63 @@
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+import pytest
+import reportlab.rl_config
+
+from pydlfmt import Column, DataFormatter
+
+pytestmark = pytest.mark.filterwarnings("ignore:unable to load the")
+
+#  shared by every report, so they have to be left alone while building
+COLUMNS = [
+    Column("id", font_size=6),
+    Column("name", wrap=True, font_size=14),
+    Column("amount", decimal_positions=2, currency=True, scalar="TOTAL", font_size=8),
+    Column("when", datatype="date", justify="CENTER"),
+    #  spreadsheet only, the PDF leaves them out
+    Column("double", excel_formula="=?column-2?row*2"),
+    Column("triple", excel_formula="=?column-1?row*3"),
+]
+
+
+def formatter(n):
+    df = DataFormatter(
+        data=[
+            dict(
+                id=i,
+                name=f"report {n} row {i} " * (1 + i % 4),
+                amount=i * 1.25 * n,
+                when=f"2021-{1 + i % 12:02}-{1 + i % 28:02}",
+            )
+            for i in range(40 + n * 7)
+        ]
+    )
+    df.title = f"Report {n}"
+    df.columns = COLUMNS
+    return df
+
+
+def render(n):
+    df = formatter(n)
+    with zipfile.ZipFile(BytesIO(df.to_excel(format_table=n % 2 == 0))) as z:
+        sheet = z.read("xl/worksheets/sheet1.xml")
+    return df.to_pdf(), sheet
+
+
+def test_concurrent_reports_match_sequential(monkeypatch):
+    #  no creation dates or random document ids in the PDFs
+    monkeypatch.setattr(reportlab.rl_config, "invariant", 1)
+
+    expected = [render(n) for n in range(8)]
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        for _ in range(2):
+            assert list(executor.map(render, range(8))) == expected
+    assert [x.name for x in COLUMNS] == [
+        "id",
+        "name",
+        "amount",
+        "when",
+        "double",
+        "triple",
+    ]
@@ -0,0 +1,119 @@
+import re
+import zipfile
+from pathlib import Path
+
+import pytest
+from reportlab.pdfbase import pdfmetrics
+
+from pydlfmt import Column, DataFormatter
+from pydlfmt.resources import FontMetrics
+from pydlfmt.widths import EXACT, FIRST, SAMPLE, WidthEstimator
+
+
+def measure(strategy, rows, sample_rows=10, seed=1):
+    estimator = WidthEstimator([len, len], strategy, sample_rows, seed=seed)
+    measured = 0
+    for row in rows:
+        if estimator.wants():
+            estimator.add(row)
+            measured += 1
+    return estimator, measured
+
+
+def test_exact_and_first():
+    rows = [["x" * (i % 50), "a<br />bbb"] for i in range(100)]
+
+    estimator, measured = measure(EXACT, rows)
+    assert measured == 100
+    assert estimator.widths() == [49, 3]
+
+    estimator, measured = measure(FIRST, rows)
+    assert measured == 10
+    assert estimator.widths() == [9, 3]
+
+
+def test_reservoir_sample():
+    rows = [[str(i), ""] for i in range(100000)]
+    estimator, measured = measure(SAMPLE, rows, sample_rows=100)
+
+    #  algorithm L only touches O(k log(n / k)) rows
+    assert measured < 2000
+    assert len(estimator.reservoir) == 100
+    #  90% of the rows are 5 digits, a sample of the first rows would be 2
+    assert estimator.widths()[0] == 5
+
+
+def test_sample_indexes():
+    estimator = WidthEstimator([len], SAMPLE, 10, seed=1)
+    indexes = estimator.sample_indexes(1000)
+    assert len(indexes) == 10
+    assert indexes == sorted(indexes)
+    assert estimator.sample_indexes(5) == [0, 1, 2, 3, 4]
+
+    assert WidthEstimator([len], EXACT).sample_indexes(1000) is None
+
+
+def test_unknown_strategy():
+    with pytest.raises(ValueError):
+        WidthEstimator([len], "median")
+
+
+def test_font_metrics_match_string_width():
+    metrics = FontMetrics("Helvetica", 9)
+    for text in ["", "Widths", "iiii", "MMMM", "Ünïcödé"]:
+        assert metrics(text) == pytest.approx(pdfmetrics.stringWidth(text, "Helvetica", 9))
+
+
+@pytest.mark.filterwarnings("ignore:unable to load the")
+def test_pdf_sample_strategy(tmp_path):
+    from pydlfmt.pdf import PDFReport
+
+    pr = PDFReport(filename=str(tmp_path / "sample.pdf"), width_strategy=SAMPLE)
+    pr.width_sample_rows = 50
+    pr.data = [dict(id=i, name="n" * (i % 40)) for i in range(2000)]
+    pr.columns = [Column("id"), Column("name")]
+    pr.build()
+    assert (tmp_path / "sample.pdf").stat().st_size > 0
+
+
+def test_xlsx_widths(tmp_path):
+    df = DataFormatter(data=[dict(id=1, name="a" * 30), dict(id=2, name="b<br />c")])
+    df.columns = [Column("id"), Column("name", max_width=20)]
+    df.to_excel(filename=str(tmp_path / "widths.xlsx"))
+
+    with zipfile.ZipFile(tmp_path / "widths.xlsx") as z:
+        sheet = z.read("xl/worksheets/sheet1.xml").decode()
+    #  width + 5, the longest line capped at max_width
+    assert re.findall(r'<col min="\d" max="\d" width="(\d+)', sheet) == ["15", "25"]
+    #  the columns themselves aren't changed
+    assert [x.width for x in df.columns] == [10, 10]
+
+
+def test_xlsx_matches_two_pass_build(tmp_path):
+    df = DataFormatter(
+        data=[
+            dict(
+                id=i,
+                name=f"name {i} " * (1 + i % 5),
+                amount=i * 12.345,
+                qty=i * 3,
+                note="a<br />bb" if i % 3 else "",
+            )
+            for i in range(12)
+        ]
+    )
+    df.columns = [
+        Column("id", max_width=8),
+        Column("name", max_width=30),
+        Column("amount", decimal_positions=2),
+        Column("qty", datatype="int", max_width=6),
+        Column("note", heading="A long note heading", max_width=25),
+    ]
+    df.to_excel(filename=str(tmp_path / "widths.xlsx"))
+
+    with zipfile.ZipFile(tmp_path / "widths.xlsx") as z:
+        sheet = z.read("xl/worksheets/sheet1.xml")
+    #  written by the two-pass build, which measured every row before any
+    #  were written
+    expected = (Path(__file__).parent / "data" / "two_pass_sheet1.xml").read_bytes()
+    assert sheet == expected
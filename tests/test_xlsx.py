@@ -0,0 +1,154 @@
+import io
+import zipfile
+
+from reportlab.lib import colors
+
+from pydlfmt import Column, DataFormatter, ReportSection, XLSXReport
+
+
+def test_formats_are_shared(tmp_path):
+    columns = [Column("id"), Column("amount", decimal_positions=2)]
+    data = [dict(id=i, amount=i * 1.5) for i in range(20)]
+    tablestyle = [("BACKGROUND", (1, i), (1, i), colors.red) for i in range(1, 21)]
+
+    xr = XLSXReport(
+        sections=[
+            ReportSection(header="One", columns=columns, data=data, tablestyle=tablestyle),
+            ReportSection(header="Two", columns=columns, data=data),
+        ],
+        filename=str(tmp_path / "formats.xlsx"),
+    )
+    xr.build()
+
+    #  one per column plus one highlighted amount format
+    assert len(xr.formats) == 3
+    assert len(xr.workbook.formats) == 2 + 3
+
+
+def test_tablestyle_ranges_and_banding(tmp_path):
+    columns = [Column("id"), Column("name")]
+    data = [dict(id=i, name=f"name {i}") for i in range(6)]
+    tablestyle = [
+        ("GRID", (0, 0), (-1, -1), 0.25, colors.gray),
+        ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, colors.yellow]),
+        ("BACKGROUND", (1, 1), (1, 2), colors.red),
+        ("TEXTCOLOR", (0, -1), (-1, -1), colors.blue),
+    ]
+    xr = XLSXReport(
+        sections=[ReportSection(header="x", columns=columns, data=data, tablestyle=tablestyle)],
+        filename=str(tmp_path / "styles.xlsx"),
+    )
+    xr.build()
+
+    colors_by_format = {}
+    for key, cell_format in xr.formats.items():
+        props = dict(key)
+        colors_by_format[cell_format.xf_index] = (props.get("bg_color"), props.get("font_color"))
+
+    ws = xr.workbook.worksheets()[0]
+    table = ws.table
+
+    def cell_colors(row, col):
+        cell = table[row][col]
+        return colors_by_format[cell.format.xf_index] if cell.format else (None, None)
+
+    assert cell_colors(1, 0) == ("#ffffff", None)
+    assert cell_colors(2, 0) == ("#ffff00", None)
+    assert cell_colors(1, 1) == ("#ff0000", None)
+    assert cell_colors(2, 1) == ("#ff0000", None)
+    assert cell_colors(3, 1) == ("#ffffff", None)
+    assert cell_colors(6, 1) == ("#ffff00", "#0000ff")
+
+
+def test_generator_data_is_consumed_once(tmp_path):
+    consumed = []
+
+    def rows():
+        for i in range(50):
+            consumed.append(i)
+            yield dict(id=i, amount=i * 2)
+
+    df = DataFormatter(data=rows())
+    df.columns = [Column("id"), Column("amount", scalar="TOTAL")]
+    df.to_excel(filename=str(tmp_path / "stream.xlsx"))
+
+    assert consumed == list(range(50))
+    with zipfile.ZipFile(tmp_path / "stream.xlsx") as z:
+        sheet = z.read("xl/worksheets/sheet1.xml").decode()
+    assert "SUM(B2:B51)" in sheet
+
+
+def test_constant_memory(tmp_path):
+    df = DataFormatter(data=(dict(id=i, name=f"name {i}") for i in range(10)))
+    df.columns = [Column("id", scalar="TOTAL"), Column("name")]
+    df.to_excel(
+        filename=str(tmp_path / "constant.xlsx"),
+        format_table=True,
+        constant_memory=True,
+    )
+
+    with zipfile.ZipFile(tmp_path / "constant.xlsx") as z:
+        sheet = z.read("xl/worksheets/sheet1.xml").decode()
+    assert 't="inlineStr"' in sheet
+    assert '<autoFilter ref="A1:B11"/>' in sheet
+    assert "SUBTOTAL(109,A2:A11)" in sheet
+    assert '<row r="13"' in sheet
+
+
+def test_xlsx_in_memory():
+    df = DataFormatter(data=[dict(id=i) for i in range(10)])
+    df.columns = [Column("id")]
+
+    with zipfile.ZipFile(io.BytesIO(df.to_excel())) as z:
+        assert "xl/worksheets/sheet1.xml" in z.namelist()
+
+    output = io.BytesIO()
+    df.to_excel(filename=output, constant_memory=True)
+    with zipfile.ZipFile(output) as z:
+        assert "xl/worksheets/sheet1.xml" in z.namelist()
+
+
+def test_tablestyle_counts_scalar_rows(tmp_path):
+    columns = [Column("id", scalar="COUNT"), Column("amount", scalar="TOTAL")]
+    data = [dict(id=i, amount=i) for i in range(4)]
+    #  the same rows as in the PDF, which ends with a COUNT and a TOTAL row
+    tablestyle = [
+        ("BACKGROUND", (0, -3), (-1, -3), colors.red),
+        ("BACKGROUND", (0, -1), (-1, -1), colors.blue),
+    ]
+    xr = XLSXReport(
+        sections=[ReportSection(header="x", columns=columns, data=data, tablestyle=tablestyle)],
+        filename=str(tmp_path / "scalars.xlsx"),
+    )
+    xr.build()
+
+    table = xr.workbook.worksheets()[0].table
+    colors_by_format = {x.xf_index: dict(key).get("bg_color") for key, x in xr.formats.items()}
+
+    def background(row):
+        cell = table[row][0]
+        return colors_by_format.get(cell.format.xf_index) if cell.format else None
+
+    #  the last data row, the totals row is left alone
+    assert background(4) == "#ff0000"
+    assert background(3) is None
+
+
+def test_tablestyle_gradient_background(tmp_path):
+    columns = [Column("id"), Column("name")]
+    data = [dict(id=i, name=f"name {i}") for i in range(3)]
+    tablestyle = [
+        ("BACKGROUND", (0, 0), (-1, 0), ["HORIZONTAL", colors.red, colors.blue]),
+        ("BACKGROUND", (0, 1), (-1, 1), ["VERTICAL", colors.yellow, colors.white]),
+    ]
+    xr = XLSXReport(
+        sections=[ReportSection(header="x", columns=columns, data=data, tablestyle=tablestyle)],
+        filename=str(tmp_path / "gradient.xlsx"),
+    )
+    xr.build()
+
+    table = xr.workbook.worksheets()[0].table
+    colors_by_format = {x.xf_index: dict(key).get("bg_color") for key, x in xr.formats.items()}
+    #  excel has no gradient fills in a cell format, it gets the first color
+    assert colors_by_format[table[1][1].format.xf_index] == "#ffff00"
+    assert table[2][0].format is None or colors_by_format.get(table[2][0].format.xf_index) is None